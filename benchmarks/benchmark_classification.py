@@ -0,0 +1,183 @@
+#------------------------------------------------------------------------------#
+#-------------------------------------------------------------------- HEADER --#
+
+"""
+:synopsis:
+    Benchmark of the headless layer classification over synthetic AOV sets.
+
+    Generates channel lists of 100 to 20,000 channels with realistic naming
+    (RGBA_ lights, CONT_specular_direct_/indirect_ contributions, cryptomattes,
+    masks, tech and utility passes) and reports the layer index, classification
+    and cache hit throughput along with the peak memory.
+
+:usage:
+    python benchmarks/benchmark_classification.py
+    python benchmarks/benchmark_classification.py --sizes 1000 20000 --budget-ms 50
+"""
+
+#------------------------------------------------------------------------------#
+#------------------------------------------------------------------- IMPORTS --#
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "layermanager", "plugins"))
+
+import layerindex
+from layerclassifier import LayerClassifier, LayerClassificationCache
+
+# ---------------------------------------------------------------------------- #
+# ----------------------------------------------------------------- GLOBALS -- #
+
+DEFAULT_SIZES = [100, 1000, 5000, 20000]
+DEFAULT_PREFERENCES = os.path.join(ROOT, "layermanager", "layermanager_preferences.json")
+
+RGBA = ["red", "green", "blue", "alpha"]
+RGB = ["red", "green", "blue"]
+XYZ = ["X", "Y", "Z"]
+
+LIGHTS = ["key", "fill", "rim", "bounce", "env", "sky", "sun", "practical", "kick", "spec"]
+ASSETS = ["hero", "crowd", "building", "ground", "prop", "vehicle", "tree", "water"]
+
+# (layer name template, channels) families, weighted like a lighting render
+FAMILIES = [
+    ("RGBA_{light}{index:02d}", RGBA, 4),
+    ("CONT_specular_direct_{light}{index:02d}", RGB, 3),
+    ("CONT_specular_indirect_{light}{index:02d}", RGB, 3),
+    ("crypto_{asset}{index:02d}", RGBA, 2),
+    ("matte_{asset}{index:02d}", RGB, 2),
+    ("Msk_{asset}{index:02d}", RGBA, 1),
+    ("{tech}_{light}{index:02d}", RGB, 3),
+    ("UTIL_{asset}{index:02d}", RGB, 1),
+    ("other_{asset}{index:02d}", RGBA, 1),
+]
+TECHS = ["diffuse_direct", "diffuse_indirect", "specular_direct", "specular_indirect", "sss", "transmission",
+         "emission", "albedo", "sheen", "coat"]
+
+UTILITY_LAYERS = [
+    ("N", XYZ), ("P", XYZ), ("Pref", XYZ), ("depth", ["Z"]), ("motion", ["u", "v"]),
+    ("forward", ["u", "v"]), ("backward", ["u", "v"]), ("UV", ["u", "v"]), ("AO", RGB),
+    ("denoise_N", XYZ), ("fresnel", RGB), ("caustic", RGB),
+]
+
+#------------------------------------------------------------------------------#
+#----------------------------------------------------------------- FUNCTIONS --#
+
+def generate_channels(count, seed=0):
+    """Return a synthetic channel list of `count` channels."""
+    rng = random.Random(seed)
+    channels = ["rgba.{}".format(channel) for channel in RGBA]
+    for layer, layer_channels in UTILITY_LAYERS:
+        channels.extend("{}.{}".format(layer, channel) for channel in layer_channels)
+
+    weighted_families = [family for family in FAMILIES for _ in range(family[2])]
+    index = 0
+    while len(channels) < count:
+        template, layer_channels, _ = rng.choice(weighted_families)
+        layer = template.format(light=rng.choice(LIGHTS), asset=rng.choice(ASSETS), tech=rng.choice(TECHS),
+                                index=index)
+        channels.extend("{}.{}".format(layer, channel) for channel in layer_channels)
+        index += 1
+
+    return channels[:count]
+
+
+class SyntheticNode(object):
+    """Minimal stand-in for a nuke node, exposing what the classification reads."""
+
+    def __init__(self, name, channels):
+        self.name = name
+        self._channels = channels
+
+    def channels(self):
+        return list(self._channels)
+
+    def fullName(self):
+        return self.name
+
+
+def best_time(function, repeat):
+    """Return the best wall time of `repeat` calls, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_size(size, preferences, repeat):
+    channels = generate_channels(size)
+    classifier = LayerClassifier(preferences)
+    layers = layerindex.build_layer_index(channels)
+
+    index_time = best_time(lambda: layerindex.build_layer_index(channels), repeat)
+    classify_time = best_time(lambda: classifier.classify(layers), repeat)
+
+    node = SyntheticNode("Read_{}".format(size), channels)
+    cache = LayerClassificationCache()
+    layerindex.clear()
+    cache.get_sections(node, classifier)
+    hit_time = best_time(lambda: cache.get_sections(node, classifier), repeat)
+
+    tracemalloc.start()
+    classifier.classify(layerindex.build_layer_index(channels))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "channels": len(channels),
+        "layers": len(layers),
+        "index_ms": index_time * 1000.0,
+        "classify_ms": classify_time * 1000.0,
+        "layers_per_s": len(layers) / classify_time if classify_time else float("inf"),
+        "cache_hit_ms": hit_time * 1000.0,
+        "peak_kib": peak / 1024.0,
+    }
+
+
+def print_results(results):
+    header = "{:>9} {:>7} {:>10} {:>12} {:>13} {:>13} {:>10}".format(
+        "channels", "layers", "index ms", "classify ms", "layers/s", "cache hit ms", "peak KiB")
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        print("{channels:>9} {layers:>7} {index_ms:>10.3f} {classify_ms:>12.3f} {layers_per_s:>13,.0f} "
+              "{cache_hit_ms:>13.3f} {peak_kib:>10.1f}".format(**result))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Layer Manager classification.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="Channel counts of the synthetic AOV sets")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measure, the best one is kept")
+    parser.add_argument("--preferences", default=DEFAULT_PREFERENCES, help="Preferences JSON to classify with")
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="Fail if index + classification of the largest set takes longer")
+    args = parser.parse_args(argv)
+
+    with open(args.preferences, "r") as file:
+        preferences = json.load(file)
+
+    results = [run_size(size, preferences, args.repeat) for size in sorted(args.sizes)]
+    print_results(results)
+
+    if args.budget_ms is not None:
+        largest = results[-1]
+        total_ms = largest["index_ms"] + largest["classify_ms"]
+        if total_ms > args.budget_ms:
+            print("Budget exceeded: {:.3f} ms > {:.3f} ms for {} channels".format(
+                total_ms, args.budget_ms, largest["channels"]))
+            return 1
+        print("Within budget: {:.3f} ms <= {:.3f} ms".format(total_ms, args.budget_ms))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+#------------------------------------------------------------------------------#
+#-------------------------------------------------------------------- HEADER --#
+
+"""
+:synopsis:
+    Startup budget check of menu.py against a stub `nuke` module.
+
+    Runs menu.py in fresh interpreters with a recording stub of the `nuke`
+    module, reports the median time it takes and fails when it is over the
+    budget or when it imports a plugin module, PySide2 included, that should
+    only be imported by its first command or callback. A script load of
+    contribution and GradeAOV nodes is then simulated, and must not import
+    their modules either.
+
+:usage:
+    python benchmarks/benchmark_startup.py
+    python benchmarks/benchmark_startup.py --runs 10 --budget-ms 20
+"""
+
+#------------------------------------------------------------------------------#
+#------------------------------------------------------------------- IMPORTS --#
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MENU_PATH = os.path.join(ROOT, "layermanager", "menu.py")
+PLUGINS_PATH = os.path.join(ROOT, "layermanager", "plugins")
+
+# ---------------------------------------------------------------------------- #
+# ----------------------------------------------------------------- GLOBALS -- #
+
+DEFAULT_RUNS = 5
+DEFAULT_BUDGET_MS = 10.0
+
+# Modules only imported on first use
+LAZY_MODULES = ["layermanager", "shuffle", "gradeaov", "contribution", "contactsheet", "PySide2"]
+
+#------------------------------------------------------------------------------#
+#----------------------------------------------------------------- FUNCTIONS --#
+
+class StubMenu(object):
+
+    def __init__(self):
+        self.commands = {}
+
+    def addMenu(self, name):
+        return self
+
+    def addCommand(self, name, command=None, shortcut=None):
+        self.commands[name] = command
+
+
+class StubNode(object):
+
+    def __init__(self, name):
+        self.name = name
+
+    def fullName(self):
+        return self.name
+
+
+def create_stub_nuke():
+    """Return a `nuke` module recording the menu commands and callbacks."""
+    nuke = types.ModuleType("nuke")
+    nuke.GUI = True
+    nuke.callbacks = {}
+    nuke.main_thread_calls = []
+    nuke.this_node = None
+    menu = StubMenu()
+
+    def add_callback(kind):
+        def add(function, args=(), kwargs={}, nodeClass="*"):
+            nuke.callbacks.setdefault((kind, nodeClass), []).append(function)
+        return add
+
+    nuke.menu = lambda name: menu
+    nuke.commands = menu.commands
+    nuke.pluginAddPath = lambda path: None
+    nuke.addOnCreate = add_callback("onCreate")
+    nuke.addOnUserCreate = add_callback("onUserCreate")
+    nuke.addOnDestroy = add_callback("onDestroy")
+    nuke.addOnScriptLoad = add_callback("onScriptLoad")
+    nuke.addKnobChanged = add_callback("knobChanged")
+    nuke.executeInMainThread = lambda function, args=(): nuke.main_thread_calls.append((function, args))
+    nuke.thisNode = lambda: nuke.this_node
+    return nuke
+
+
+def simulate_script_load(nuke, node_classes=("contribution", "gradeaov"), count=100):
+    """Run the creation callbacks of a script load of `count` nodes of each class."""
+    for callback in nuke.callbacks.get(("onCreate", "Root"), []):
+        callback()
+    for node_class in node_classes:
+        for index in range(count):
+            nuke.this_node = StubNode("{}{}".format(node_class, index + 1))
+            for callback in nuke.callbacks.get(("onCreate", node_class), []):
+                callback()
+    for callback in nuke.callbacks.get(("onScriptLoad", "*"), []):
+        callback()
+    # Then the event loop runs the queued calls
+    while nuke.main_thread_calls:
+        function, args = nuke.main_thread_calls.pop(0)
+        function(*args)
+
+
+def run_child():
+    """Run menu.py and a script load in this interpreter, print the results as JSON."""
+    nuke = create_stub_nuke()
+    sys.modules["nuke"] = nuke
+    sys.path.insert(0, PLUGINS_PATH)
+
+    with open(MENU_PATH) as menu_file:
+        menu_code = compile(menu_file.read(), MENU_PATH, "exec")
+
+    start = time.perf_counter()
+    exec(menu_code, {"__name__": "menu", "__file__": MENU_PATH})
+    menu_ms = (time.perf_counter() - start) * 1000.0
+    menu_modules = [name for name in LAZY_MODULES if name in sys.modules]
+
+    start = time.perf_counter()
+    simulate_script_load(nuke)
+    load_ms = (time.perf_counter() - start) * 1000.0
+    load_modules = [name for name in LAZY_MODULES if name in sys.modules]
+
+    print(json.dumps({
+        "menu_ms": menu_ms,
+        "load_ms": load_ms,
+        "menu_modules": menu_modules,
+        "load_modules": load_modules,
+        "commands": sorted(nuke.commands),
+    }))
+
+
+def run_once():
+    output = subprocess.check_output([sys.executable, os.path.abspath(__file__), "--child"])
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the startup budget of menu.py.")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        run_child()
+        return 0
+
+    results = [run_once() for _ in range(max(1, args.runs))]
+    menu_ms = statistics.median(result["menu_ms"] for result in results)
+    load_ms = statistics.median(result["load_ms"] for result in results)
+    print("{:<28}{:>10.2f} ms (budget {:.2f} ms)".format("menu.py", menu_ms, args.budget_ms))
+    print("{:<28}{:>10.2f} ms".format("script load callbacks", load_ms))
+    print("{:<28}{}".format("menu commands", ", ".join(results[0]["commands"])))
+
+    failures = []
+    if menu_ms > args.budget_ms:
+        failures.append("menu.py took {:.2f} ms, over the {:.2f} ms budget".format(menu_ms, args.budget_ms))
+    if results[0]["menu_modules"]:
+        failures.append("menu.py imported: {}".format(", ".join(results[0]["menu_modules"])))
+    if results[0]["load_modules"]:
+        failures.append("the script load imported: {}".format(", ".join(results[0]["load_modules"])))
+
+    for failure in failures:
+        print("FAILED: {}".format(failure))
+    if not failures:
+        print("OK")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
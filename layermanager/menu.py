@@ -15,28 +15,21 @@ for path in [nuke_path, plugins_path]:
     if path not in sys.path:
         sys.path.append(path)
 
-import layermanager
-import shuffle
-import gradeaov
-import contribution
+# The plugins are imported by their first command or callback
+import deferredinit
+from lazyplugins import lazy_function, lazy_on_create
 
 # Create the main menu
 dd_tools_menu = nuke.menu('Nuke').addMenu('DD Tools')
 
 # Submenu LayerAOV Tools
 layeraov_menu = dd_tools_menu.addMenu('Layer Tools')
-layeraov_menu.addCommand('Layer Manager', 'layermanager.run()', '`')
-layeraov_menu.addCommand('Shuffle Auto', 'shuffle.run()', 'V')
-
-# Register contributions if available
-if hasattr(contribution, 'register_contribution'):
-    contribution.register_contribution()
-
-# Add Nuke callbacks
-def register_callbacks():
-    for node in nuke.allNodes("contribution"):
-        node.knobChanged = contribution.knobChanged
-
-nuke.addOnScriptLoad(register_callbacks)
-nuke.addOnCreate(contribution.knobChanged, nodeClass="contribution")
-nuke.addOnCreate(gradeaov.knobChanged, nodeClass="gradeaov")
\ No newline at end of file
+layeraov_menu.addCommand('Layer Manager', lazy_function('layermanager', 'run'), '`')
+layeraov_menu.addCommand('Shuffle Auto', lazy_function('shuffle', 'run'), 'V')
+
+# Add Nuke callbacks, the gizmos created by a script load are initialised on first use
+deferredinit.register()
+nuke.addOnUserCreate(lazy_function('contribution', 'knobChanged'), nodeClass="contribution")
+nuke.addOnCreate(lazy_on_create('contribution', 'initialize_knobs'), nodeClass="contribution")
+nuke.addOnDestroy(lazy_function('contribution', 'onDestroy'), nodeClass="contribution")
+nuke.addOnCreate(lazy_on_create('gradeaov', 'initialize_node'), nodeClass="gradeaov")
\ No newline at end of file
@@ -0,0 +1,458 @@
+#------------------------------------------------------------------------------#
+#-------------------------------------------------------------------- HEADER --#
+
+"""
+:synopsis:
+    Contact sheet builder of the Layer Manager.
+
+    The whole contact sheet group (one Shuffle -> Crop -> Grid -> Text branch per
+    layer feeding a ContactSheet) is generated as a single serialized node script
+    and pasted in one operation, instead of creating and placing every node
+    interactively.
+
+    Modes:
+    - full: every branch works at the plate resolution
+    - lightweight: the input is downscaled to a proxy tile once, before the branches
+    - sequence: lightweight tiles shown one layer per frame through a Switch, so the
+      viewer only pulls a single layer at a time
+
+    The tile and sheet sizes are computed from the source format and proxy scale,
+    a target tile width and an output size cap, so the sheet cost follows the
+    review resolution rather than the plate resolution.
+
+    Each group is tagged with its section and keeps a registry of its branches in
+    hidden knobs. Creating the contact sheet of a section again updates the existing
+    group in place, adding and removing only the branches of the changed layers.
+"""
+
+#------------------------------------------------------------------------------#
+#------------------------------------------------------------------- IMPORTS --#
+
+import json
+import math
+import os
+import re
+import tempfile
+
+import nuke
+
+# ---------------------------------------------------------------------------- #
+# ----------------------------------------------------------------- GLOBALS -- #
+
+GROUP_COLOR = 4278190335
+
+MODE_FULL = "full"
+MODE_LIGHTWEIGHT = "lightweight"
+MODE_SEQUENCE = "sequence"
+CONTACT_SHEET_MODES = [MODE_FULL, MODE_LIGHTWEIGHT, MODE_SEQUENCE]
+
+# Defaults of the optional "Contact Sheet Tile Width", "Contact Sheet Max Width" and
+# "Contact Sheet Max Height" preferences
+TILE_WIDTH = 480
+MAX_SHEET_WIDTH = 3840
+MAX_SHEET_HEIGHT = 2160
+
+# Label band under each plate of the full mode, as a fraction of the plate height
+LABEL_BAND = 0.065
+# Side margin of each plate of the full mode, as a fraction of the plate width
+SIDE_MARGIN = 0.007
+MIN_TILE_WIDTH = 16
+MIN_TEXT_SIZE = 8
+
+# Hidden knobs of the group: the section it shows, and its branch registry (JSON)
+TAG_KNOB = "layermanager_contact_sheet"
+REGISTRY_KNOB = "layermanager_contact_sheet_branches"
+
+# Nodes of a branch, named "<kind>_<branch id>" inside the group
+BRANCH_NODES = ["shuffle", "crop", "grid", "text"]
+COMBINE_NODES = {MODE_FULL: "contact_sheet", MODE_LIGHTWEIGHT: "contact_sheet", MODE_SEQUENCE: "layer_switch"}
+
+# Node graph layout inside the group
+BRANCH_SPACING = 80
+BRANCH_TOP = 200
+
+#------------------------------------------------------------------------------#
+#----------------------------------------------------------------- FUNCTIONS --#
+
+class Expression(str):
+    """Knob value written as an expression instead of a quoted string."""
+
+
+class ContactSheetLayout(object):
+    """
+    Sizes of a contact sheet, computed from the source format.
+
+    The plate sizes are the ones the per-layer branches of the full mode work at,
+    the tile sizes are the cells of the sheet and the proxy format of the other modes.
+    """
+
+    def __init__(self, count, plate_width, plate_height, pixel_aspect=1.0, proxy_scale=1.0,
+                 tile_width=TILE_WIDTH, max_width=MAX_SHEET_WIDTH, max_height=MAX_SHEET_HEIGHT):
+        self.count = max(1, count)
+        self.rows, self.columns = get_grid(self.count)
+
+        # Size of the image the branches receive, proxy mode included
+        self.plate_width = max(1, int(round(plate_width * proxy_scale)))
+        self.plate_height = max(1, int(round(plate_height * proxy_scale)))
+        self.label_band = max(MIN_TEXT_SIZE, int(round(self.plate_height * LABEL_BAND)))
+        self.side_margin = int(round(self.plate_width * SIDE_MARGIN))
+
+        # Never upsample the plate, and keep its display aspect
+        aspect = (plate_width * pixel_aspect) / float(plate_height)
+        tile_width = min(tile_width, int(round(self.plate_width * pixel_aspect)))
+        self.gap = max(2, tile_width // 60)
+
+        # Shrink the tiles until the sheet fits in the output size cap
+        fit_width = (max_width - (self.columns - 1) * self.gap) // self.columns
+        fit_height = (max_height - (self.rows - 1) * self.gap) / float(self.rows)
+        self.tile_width = max(MIN_TILE_WIDTH, int(min(tile_width, fit_width, fit_height * aspect)))
+        self.tile_height = max(1, int(round(self.tile_width / aspect)))
+        self.text_size = max(MIN_TEXT_SIZE, self.tile_height // 16)
+
+        self.width = self.columns * self.tile_width + (self.columns - 1) * self.gap
+        self.height = self.rows * self.tile_height + (self.rows - 1) * self.gap
+
+    def crop_box(self):
+        """Crop of the full mode plates, with room for the label under the image."""
+        return [-self.side_margin, -self.label_band, self.plate_width + self.side_margin,
+                self.plate_height + self.side_margin]
+
+    def text_box(self, mode):
+        if mode == MODE_FULL:
+            return [0, 0, self.plate_width, self.plate_height]
+        return [0, 0, self.tile_width, self.tile_height]
+
+    def text_size_for(self, mode):
+        if mode == MODE_FULL:
+            return int(self.label_band * 0.7)
+        return self.text_size
+
+
+def tcl_value(value):
+    """Serialize a knob value for a node script."""
+    if isinstance(value, Expression):
+        return "{{" + value + "}}"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return str(value)
+    if isinstance(value, (list, tuple)):
+        return "{" + " ".join(tcl_value(item) for item in value) + "}"
+    value = str(value)
+    if value and re.match(r'^[\w.\-]+$', value):
+        return value
+    return '"{}"'.format(value.replace('\\', '\\\\').replace('"', '\\"').replace('[', '\\[').replace('$', '\\$'))
+
+
+def node_script(node_class, knobs):
+    """Return the script block of one node, knobs being an ordered list of (name, value)."""
+    lines = [" {} {{".format(node_class)]
+    lines.extend("  {} {}".format(name, tcl_value(value)) for name, value in knobs)
+    lines.append(" }")
+    return "\n".join(lines)
+
+
+def get_node_name(name):
+    """Return a valid node name (letters, digits and underscores)."""
+    return re.sub(r'\W', '_', name)
+
+
+def get_grid(count):
+    """Return (rows, columns) of a contact sheet of `count` tiles."""
+    rows = max(1, int(math.floor(math.sqrt(count))))
+    columns = int(math.ceil(count / float(rows)))
+    return rows, columns
+
+
+def get_branch_xpos(index, count):
+    return -(BRANCH_SPACING * count) // 2 + index * BRANCH_SPACING
+
+
+def build_branch_script(layer, branch_id, xpos, layout, mode=MODE_FULL):
+    """
+    Return the branch of one layer, reading the stack top: Shuffle -> Crop -> Grid -> Text in
+    full mode, Shuffle -> Grid -> Text on the proxy tile otherwise.
+    """
+    text = node_script("Text", [("message", layer), ("box", layout.text_box(mode)),
+                                ("size", layout.text_size_for(mode)), ("xjustify", "center"),
+                                ("yjustify", "bottom"), ("name", "text_{}".format(branch_id)),
+                                ("xpos", xpos), ("ypos", BRANCH_TOP + 250)])
+    shuffle = node_script("Shuffle", [("in", layer), ("label", layer), ("name", "shuffle_{}".format(branch_id)),
+                                      ("xpos", xpos), ("ypos", BRANCH_TOP)])
+    if mode == MODE_FULL:
+        return "\n".join([
+            shuffle,
+            node_script("Crop", [("box", layout.crop_box()), ("reformat", True),
+                                 ("name", "crop_{}".format(branch_id)), ("xpos", xpos), ("ypos", BRANCH_TOP + 50)]),
+            node_script("Grid", [("number", 1), ("size", 4), ("name", "grid_{}".format(branch_id)),
+                                 ("xpos", xpos), ("ypos", BRANCH_TOP + 150)]),
+            text,
+        ])
+
+    # The input is already at the tile format, no Crop is needed
+    return "\n".join([
+        shuffle,
+        node_script("Grid", [("number", 1), ("size", 1), ("name", "grid_{}".format(branch_id)),
+                             ("xpos", xpos), ("ypos", BRANCH_TOP + 150)]),
+        text,
+    ])
+
+
+def build_input_script(layout, mode):
+    """Return the Input of the group, downscaled to the proxy tile outside the full mode."""
+    lines = [node_script("Input", [("inputs", 0), ("name", "Input1"), ("xpos", 0), ("ypos", 0)])]
+    if mode != MODE_FULL:
+        lines.append(node_script("Reformat", [
+            ("type", "to box"), ("box_width", layout.tile_width), ("box_height", layout.tile_height),
+            ("box_fixed", True), ("resize", "fit"), ("black_outside", True), ("name", "proxy_reformat"),
+            ("xpos", 0), ("ypos", 50)]))
+    lines.append(node_script("Dot", [("name", "input_dot"), ("xpos", 34), ("ypos", 100)]))
+    lines.append("set N_input_dot [stack 0]")
+    return lines
+
+
+def build_combine_script(layers, layout, mode, first_frame):
+    """Return the node gathering the branches: a ContactSheet, or a frame driven Switch."""
+    count = len(layers)
+    if mode == MODE_SEQUENCE:
+        which = Expression(get_switch_expression(count, first_frame))
+        return node_script("Switch", [("inputs", count), ("which", which), ("name", "layer_switch"),
+                                      ("xpos", 0), ("ypos", BRANCH_TOP + 450)])
+
+    return node_script("ContactSheet", [("inputs", count)] + get_sheet_knobs(layout) + [
+        ("center", True), ("roworder", "TopBottom"), ("name", "contact_sheet"), ("xpos", 0),
+        ("ypos", BRANCH_TOP + 450)])
+
+
+def get_sheet_knobs(layout):
+    """Return the layout dependent knobs of the ContactSheet."""
+    return [("width", layout.width), ("height", layout.height), ("rows", layout.rows),
+            ("columns", layout.columns), ("gap", layout.gap)]
+
+
+def get_switch_expression(count, first_frame):
+    # Frame first_frame shows the first layer, one layer per frame after it
+    return "clamp(frame - {}, 0, {})".format(first_frame, count - 1)
+
+
+def build_contact_sheet_script(layers, group_name, layout, mode=MODE_FULL, first_frame=1):
+    """
+    Return the node script of a contact sheet group of the given layers.
+
+    In a node script the top of the stack is input 0, so the branches are written from
+    the last layer to the first one for the ContactSheet inputs to follow the layer order.
+    """
+    lines = [
+        "Group {",
+        " name {}".format(get_node_name(group_name)),
+        " tile_color {}".format(GROUP_COLOR),
+        "}",
+    ]
+    lines.extend(build_input_script(layout, mode))
+
+    for i in reversed(range(len(layers))):
+        # The first branch written reads the Dot left on the stack, the others push it again
+        if i != len(layers) - 1:
+            lines.append("push $N_input_dot")
+        lines.append(build_branch_script(layers[i], i, get_branch_xpos(i, len(layers)), layout, mode))
+
+    lines.extend([
+        build_combine_script(layers, layout, mode, first_frame),
+        node_script("Output", [("name", "Output1"), ("xpos", 0), ("ypos", BRANCH_TOP + 550)]),
+        "end_group",
+    ])
+    return "\n".join(lines) + "\n"
+
+
+def get_proxy_scale():
+    """Return the scale the script is processed at, 1.0 outside the proxy mode."""
+    root = nuke.root()
+    if not root['proxy'].value():
+        return 1.0
+    if root['proxy_type'].value() == 'scale':
+        return float(root['proxy_scale'].value())
+    proxy_format = root['proxy_format'].value()
+    return proxy_format.width() / float(root.format().width())
+
+
+def get_layout(source_node, count, preferences=None):
+    """Return the ContactSheetLayout of `count` layers of source_node."""
+    preferences = preferences or {}
+    source_format = source_node.format()
+    return ContactSheetLayout(
+        count, source_format.width(), source_format.height(), source_format.pixelAspect(), get_proxy_scale(),
+        tile_width=preferences.get("Contact Sheet Tile Width", TILE_WIDTH),
+        max_width=preferences.get("Contact Sheet Max Width", MAX_SHEET_WIDTH),
+        max_height=preferences.get("Contact Sheet Max Height", MAX_SHEET_HEIGHT))
+
+
+def paste_script(script):
+    """Paste a node script in the current context in a single operation and return the pasted nodes."""
+    for node in nuke.selectedNodes():
+        node['selected'].setValue(False)
+
+    fd, script_path = tempfile.mkstemp(suffix=".nk")
+    try:
+        with os.fdopen(fd, 'w') as file:
+            file.write(script)
+        nuke.nodePaste(script_path)
+    finally:
+        os.remove(script_path)
+    return nuke.selectedNodes()
+
+
+def get_registry(group_node):
+    """Return the branch registry of a contact sheet group."""
+    return json.loads(group_node[REGISTRY_KNOB].value())
+
+
+def set_registry(group_node, registry):
+    group_node[REGISTRY_KNOB].setValue(json.dumps(registry))
+
+
+def tag_contact_sheet(group_node, section_name, registry):
+    """Add the hidden section tag and branch registry knobs to a contact sheet group."""
+    for knob_name, value in ((TAG_KNOB, section_name), (REGISTRY_KNOB, json.dumps(registry))):
+        knob = nuke.String_Knob(knob_name, knob_name)
+        knob.setFlag(nuke.INVISIBLE)
+        group_node.addKnob(knob)
+        knob.setValue(value)
+
+
+def get_source_node(node):
+    """Return the node feeding a contact sheet group, node itself when it is not a contact sheet."""
+    while TAG_KNOB in node.knobs() and node.input(0) is not None:
+        node = node.input(0)
+    return node
+
+
+def find_contact_sheet(source_node, section_name):
+    """Return the tagged contact sheet group of a section fed by source_node, or None."""
+    source_node = get_source_node(source_node)
+    for node in nuke.allNodes('Group'):
+        if TAG_KNOB not in node.knobs() or node[TAG_KNOB].value() != section_name:
+            continue
+        if node.input(0) is not None and node.input(0).fullName() == source_node.fullName():
+            return node
+    return None
+
+
+def update_contact_sheet(group_node, layers, layout, mode, first_frame):
+    """
+    Update a tagged contact sheet group in place: delete the branches of the removed
+    layers, paste the branches of the new ones, then reorder the gathering node inputs.
+    Return the (added, removed) layers.
+    """
+    registry = get_registry(group_node)
+    branches = dict(registry["branches"])
+    removed = [layer for layer in branches if layer not in layers]
+
+    with group_node:
+        # Branches with a node deleted by hand are dropped and built again
+        broken = [layer for layer in branches if layer in layers and any(
+            nuke.toNode("{}_{}".format(kind, branches[layer])) is None for kind in BRANCH_NODES)]
+        added = [layer for layer in layers if layer not in branches or layer in broken]
+
+        for layer in removed + broken:
+            for kind in BRANCH_NODES:
+                node = nuke.toNode("{}_{}".format(kind, branches[layer]))
+                if node is not None:
+                    nuke.delete(node)
+            del branches[layer]
+
+        if added:
+            lines = []
+            for layer in added:
+                branches[layer] = registry["next_id"]
+                registry["next_id"] += 1
+                lines.extend(["push 0", build_branch_script(layer, branches[layer], 0, layout, mode)])
+            paste_script("\n".join(lines) + "\n")
+
+            input_dot = nuke.toNode("input_dot")
+            for layer in added:
+                nuke.toNode("shuffle_{}".format(branches[layer])).setInput(0, input_dot)
+
+        # The layout follows the layer count, the kept branches only get knob updates
+        if mode != MODE_FULL:
+            reformat = nuke.toNode("proxy_reformat")
+            reformat['box_width'].setValue(layout.tile_width)
+            reformat['box_height'].setValue(layout.tile_height)
+
+        combine = nuke.toNode(COMBINE_NODES[mode])
+        for i, layer in enumerate(layers):
+            branch_id = branches[layer]
+            xpos = get_branch_xpos(i, len(layers))
+            for kind in BRANCH_NODES:
+                node = nuke.toNode("{}_{}".format(kind, branch_id))
+                if node is not None:
+                    node.setXpos(xpos)
+            text_node = nuke.toNode("text_{}".format(branch_id))
+            text_node['box'].setValue(layout.text_box(mode))
+            text_node['size'].setValue(layout.text_size_for(mode))
+            if mode == MODE_FULL:
+                nuke.toNode("crop_{}".format(branch_id))['box'].setValue(layout.crop_box())
+            combine.setInput(i, text_node)
+        for i in range(len(layers), combine.inputs()):
+            combine.setInput(i, None)
+
+        if mode == MODE_SEQUENCE:
+            combine['which'].setExpression(get_switch_expression(len(layers), first_frame))
+        else:
+            for knob_name, value in get_sheet_knobs(layout):
+                combine[knob_name].setValue(value)
+
+    registry["branches"] = [[layer, branches[layer]] for layer in layers]
+    set_registry(group_node, registry)
+    return added, removed
+
+
+def replace_contact_sheet(old_group, new_group):
+    """Move the dependents and position of old_group to new_group, then delete old_group."""
+    for node in old_group.dependent(nuke.INPUTS | nuke.HIDDEN_INPUTS, forceEvaluate=False):
+        for i in range(node.inputs()):
+            if node.input(i) is old_group:
+                node.setInput(i, new_group)
+    new_group.setXYpos(old_group.xpos(), old_group.ypos())
+    name = old_group.name()
+    nuke.delete(old_group)
+    new_group.setName(name)
+
+
+def create_contact_sheet(source_node, layers, section_name, mode=MODE_FULL, preferences=None):
+    """
+    Create the contact sheet group of the layers under source_node and return it.
+
+    An existing group of the same section and source is updated in place when it was
+    built with the same mode, and replaced otherwise.
+    """
+    if mode not in CONTACT_SHEET_MODES:
+        print(f"Unknown contact sheet mode {mode!r}, using {MODE_FULL}")
+        mode = MODE_FULL
+
+    # A selected contact sheet stands for its source, clicking again updates it
+    source_node = get_source_node(source_node)
+
+    layout = get_layout(source_node, len(layers), preferences)
+    first_frame = int(nuke.root().firstFrame())
+
+    existing_group = find_contact_sheet(source_node, section_name)
+    if existing_group is not None and get_registry(existing_group).get("mode") == mode:
+        added, removed = update_contact_sheet(existing_group, layers, layout, mode, first_frame)
+        print(f"Updated {existing_group.name()}: {len(added)} layers added, {len(removed)} removed")
+        return existing_group
+
+    script = build_contact_sheet_script(layers, "{} ContactSheet".format(section_name), layout, mode, first_frame)
+    group_node = paste_script(script)[0]
+    tag_contact_sheet(group_node, section_name, {
+        "mode": mode,
+        "branches": [[layer, i] for i, layer in enumerate(layers)],
+        "next_id": len(layers),
+    })
+
+    group_node.setInput(0, source_node)
+    if existing_group is not None:
+        replace_contact_sheet(existing_group, group_node)
+    else:
+        group_node.setXpos(source_node.xpos())
+        group_node.setYpos(source_node.ypos() + source_node.screenHeight() + 50)
+    return group_node
@@ -0,0 +1,248 @@
+#------------------------------------------------------------------------------#
+#-------------------------------------------------------------------- HEADER --#
+
+"""
+:synopsis:
+    Headless render of the section contact sheets, for farm-side batch review.
+
+    Opens a script, classifies the layers of a source node with the Layer Manager
+    preferences, builds the contact sheet of every section and writes it to disk
+    with a Write node. Sections are split in frame chunks rendered in parallel by
+    a pool of `nuke -t` worker processes.
+
+    The job planning, worker command lines and pool only rely on the `nuke` module
+    through the render functions, so they run against a stubbed `nuke` module.
+
+:usage:
+    nuke -t contactsheetrender.py shot.nk Read1
+    nuke -t contactsheetrender.py shot.nk Read1 --frames 1001-1100 --chunk 20 --workers 4 \
+        --output /review/{shot}/{section}/{shot}_{section}.####.exr --mode lightweight
+"""
+
+#------------------------------------------------------------------------------#
+#------------------------------------------------------------------- IMPORTS --#
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Under `nuke -t` the plugins folder is not on the path yet
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import nuke
+import contactsheet
+import layerindex
+import layerpreferences
+from layerclassifier import SECTION_KEYS
+
+# ---------------------------------------------------------------------------- #
+# ----------------------------------------------------------------- GLOBALS -- #
+
+DEFAULT_OUTPUT = os.path.join("{script_dir}", "contactsheets", "{section}", "{shot}_{section}.####.jpg")
+DEFAULT_CHUNK = 10
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+
+# Nuke binary of the workers, the running one by default
+NUKE_EXECUTABLE = os.environ.get("LAYERMANAGER_NUKE_EXECUTABLE", sys.executable)
+
+#------------------------------------------------------------------------------#
+#----------------------------------------------------------------- FUNCTIONS --#
+
+class RenderJob(object):
+    """
+    Frame chunk of one section contact sheet.
+    """
+    __slots__ = ("section", "layers", "first", "last", "output")
+
+    def __init__(self, section, layers, first, last, output):
+        self.section = section
+        self.layers = layers
+        self.first = first
+        self.last = last
+        self.output = output
+
+    def __repr__(self):
+        return "RenderJob({!r}, {} layers, {}-{})".format(self.section, len(self.layers), self.first, self.last)
+
+
+def parse_frame_range(frames):
+    """Return (first, last) of a "1001-1100" or "1001" frame range."""
+    first, _, last = frames.partition("-")
+    first = int(first)
+    last = int(last) if last else first
+    if last < first:
+        raise ValueError(f"Invalid frame range: {frames}")
+    return first, last
+
+
+def get_frame_chunks(first, last, chunk):
+    """Split first-last in inclusive (first, last) chunks of at most `chunk` frames."""
+    chunk = max(1, chunk)
+    return [(start, min(start + chunk - 1, last)) for start in range(first, last + 1, chunk)]
+
+
+def get_output_path(pattern, script_path, section):
+    """Fill the {script_dir}, {shot} and {section} fields of an output path pattern."""
+    return pattern.format(
+        script_dir=os.path.dirname(os.path.abspath(script_path)),
+        shot=os.path.splitext(os.path.basename(script_path))[0],
+        section=contactsheet.get_node_name(section))
+
+
+def get_section_layers(layers, classifier, sections=None):
+    """Return the section -> layers map of the non empty sections, in section order."""
+    classified = classifier.classify(layers)
+    return OrderedDict(
+        (section, classified[section]) for section in SECTION_KEYS
+        if classified[section] and (not sections or section in sections))
+
+
+def plan_jobs(section_layers, first, last, chunk, output_pattern, script_path):
+    """Return the RenderJobs of every section, one per frame chunk."""
+    jobs = []
+    for section, layers in section_layers.items():
+        output = get_output_path(output_pattern, script_path, section)
+        for chunk_first, chunk_last in get_frame_chunks(first, last, chunk):
+            jobs.append(RenderJob(section, layers, chunk_first, chunk_last, output))
+    return jobs
+
+
+def get_worker_command(job, script_path, source_name, mode, nuke_executable=NUKE_EXECUTABLE):
+    """Return the `nuke -t` command line rendering one job."""
+    return [
+        nuke_executable, "-t", os.path.abspath(__file__), "--worker",
+        os.path.abspath(script_path), source_name,
+        "--section", job.section,
+        "--layers", json.dumps(job.layers),
+        "--frames", "{}-{}".format(job.first, job.last),
+        "--output", job.output,
+        "--mode", mode,
+    ]
+
+
+def run_workers(commands, workers=DEFAULT_WORKERS, run=subprocess.run):
+    """
+    Run the worker command lines, at most `workers` processes at a time.
+
+    Each thread only waits on its own process, the rendering happens in the workers.
+    Return the (command, return code) of the failed ones.
+    """
+    def run_command(command):
+        print("Rendering: {}".format(" ".join(command[3:])))
+        return command, run(command).returncode
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        results = list(executor.map(run_command, commands))
+    return [(command, returncode) for command, returncode in results if returncode != 0]
+
+
+def get_file_type(output):
+    extension = os.path.splitext(output)[1].lstrip(".").lower()
+    return "jpeg" if extension == "jpg" else extension
+
+
+def render_job(source_node, job, mode, preferences=None):
+    """
+    Build the contact sheet of a job under source_node and write its frames. The chunks
+    of a section rendered in the same session update the same contact sheet group.
+    """
+    group_node = contactsheet.create_contact_sheet(source_node, job.layers, job.section, mode, preferences)
+
+    output_dir = os.path.dirname(job.output)
+    if output_dir and not os.path.isdir(output_dir):
+        os.makedirs(output_dir, exist_ok=True)
+
+    file_type = get_file_type(job.output)
+    write_node = nuke.nodes.Write(file=job.output, file_type=file_type,
+                                  channels="rgba" if file_type == "exr" else "rgb")
+    write_node.setInput(0, group_node)
+    try:
+        nuke.execute(write_node, job.first, job.last, 1)
+    finally:
+        nuke.delete(write_node)
+
+
+def open_source(script_path, source_name):
+    """Open the script and return its source node."""
+    nuke.scriptOpen(script_path)
+    source_node = nuke.toNode(source_name)
+    if source_node is None:
+        raise ValueError(f"Source node not found: {source_name}")
+    return source_node
+
+
+def run_worker(args):
+    source_node = open_source(args.script, args.source)
+    first, last = parse_frame_range(args.frames)
+    job = RenderJob(args.section, json.loads(args.layers), first, last, args.output)
+    render_job(source_node, job, args.mode, layerpreferences.layermanager_preferences.load())
+    return 0
+
+
+def run_controller(args):
+    source_node = open_source(args.script, args.source)
+    if args.frames:
+        first, last = parse_frame_range(args.frames)
+    else:
+        first, last = int(nuke.root().firstFrame()), int(nuke.root().lastFrame())
+
+    preferences = layerpreferences.layermanager_preferences.load()
+    classifier = layerpreferences.layermanager_preferences.get_classifier()
+    section_layers = get_section_layers(layerindex.get_layers(source_node), classifier, args.sections)
+    jobs = plan_jobs(section_layers, first, last, args.chunk, args.output, args.script)
+    if not jobs:
+        print(f"No layers to render from {args.source}")
+        return 1
+    print("Rendering {} sections in {} jobs".format(len(section_layers), len(jobs)))
+
+    # A single worker renders in this session, the script is already open
+    if args.workers <= 1:
+        for job in jobs:
+            print(f"Rendering: {job!r}")
+            render_job(source_node, job, args.mode, preferences)
+        return 0
+
+    commands = [get_worker_command(job, args.script, args.source, args.mode, args.nuke) for job in jobs]
+    failures = run_workers(commands, args.workers)
+    for command, returncode in failures:
+        print("Failed ({}): {}".format(returncode, " ".join(command[3:])))
+    return 1 if failures else 0
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(description="Render the Layer Manager section contact sheets.")
+    parser.add_argument("script", help="Nuke script to open")
+    parser.add_argument("source", help="Name of the node whose layers are rendered")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT,
+                        help="Output path, with {script_dir}, {shot} and {section} fields and #### frame padding")
+    parser.add_argument("--frames", help="Frame range (first-last), the script range by default")
+    parser.add_argument("--sections", nargs="+", choices=SECTION_KEYS, help="Sections to render, all by default")
+    parser.add_argument("--mode", default=contactsheet.MODE_LIGHTWEIGHT, choices=contactsheet.CONTACT_SHEET_MODES)
+    parser.add_argument("--chunk", type=int, default=DEFAULT_CHUNK, help="Frames per worker job")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Parallel nuke -t processes")
+    parser.add_argument("--nuke", default=NUKE_EXECUTABLE, help="Nuke executable of the workers")
+
+    # Used by the controller to start the workers
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--section", help=argparse.SUPPRESS)
+    parser.add_argument("--layers", help=argparse.SUPPRESS)
+    return parser
+
+
+def main(argv=None):
+    args = get_parser().parse_args(argv)
+    try:
+        if args.worker:
+            return run_worker(args)
+        return run_controller(args)
+    except Exception as e:
+        print(f"Error rendering contact sheets: {str(e)}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,138 +9,247 @@
 #------------------------------------------------------------------------------#
 #------------------------------------------------------------------- IMPORTS --#
 
+from collections import OrderedDict
+
 import nuke
-import os
-import json
+import deferredinit
+import layerindex
+import layerpreferences
+
+# ---------------------------------------------------------------------------- #
+# ----------------------------------------------------------------- GLOBALS -- #
+
+# Number of channel sets whose contribution index is kept in memory
+MAX_CONTRIBUTION_INDEXES = 32
+
+_contribution_indexes = OrderedDict()
+
+# Contribution nodes whose input changed, updated together on the next event loop tick
+_pending_nodes = OrderedDict()
+# Contribution nodes being updated, their own knob changes are ignored
+_updating_nodes = set()
+# ContributionIndex last applied to each contribution node
+_applied_indexes = {}
 
 #------------------------------------------------------------------------------#
 #----------------------------------------------------------------- FUNCTIONS --#
 
 def load_viewerpass_preferences():
-    """Charge les préférences de Viewer Pass depuis le fichier JSON dans ~/.nuke."""
-    preferences_path = os.path.join(os.path.expanduser("~"), ".nuke", "viewerpass_preferences.json")
+    """Charge les préférences de Viewer Pass depuis ~/.nuke, relues seulement si le fichier a changé."""
+    return layerpreferences.viewerpass_preferences.load(copy_data=False)
 
-    if not os.path.exists(preferences_path):
-        print(f"⚠️ Le fichier {preferences_path} n'existe pas.")
-        return {}
 
-    try:
-        with open(preferences_path, "r") as file:
-            data = json.load(file)
-            return data
-    except Exception as e:
-        print(f"⚠️ Erreur lors du chargement de {preferences_path}: {e}")
-        return {}
-
-
-# Charger les préférences dès le début du script
-viewerpass_preferences = load_viewerpass_preferences()
+def filter_layers(layers, filter_values):
+    """Return the sorted layers starting with one of the filter values, all of them without filter."""
+    if filter_values:
+        layers = [layer for layer in layers if layer.startswith(tuple(filter_values))]
+    return sorted(layers)
 
 
 def get_layers(node, category="Light Pass"):
     """Récupère les layers d'un nœud, optionnellement filtrés selon les préférences JSON."""
-    channels = node.channels()
-    layers = list(set([c.split('.')[0] for c in channels]))  # Extraire les layers
+    layers = layerindex.get_layers(node)  # Extraire les layers (index partagé)
 
     # Charger la valeur de filtre depuis le JSON
-    filter_values = viewerpass_preferences.get(category, [])
-
-    if filter_values:
-        layers = [layer for layer in layers if any(layer.startswith(f) for f in filter_values)]
-
-    layers.sort()
-    return layers
+    filter_values = load_viewerpass_preferences().get(category, [])
+    return filter_layers(layers, filter_values)
+
+
+class ContributionIndex(object):
+    """
+    Light layers of a channel set and the contribution layers of each light.
+    """
+    __slots__ = ("light_layers", "contribution_layers", "contributions")
+
+    def __init__(self, layers, light_filters=(), contribution_filters=()):
+        self.light_layers = filter_layers(layers, light_filters)
+        self.contribution_layers = filter_layers(layers, contribution_filters)
+        self.contributions = dict(
+            (light, self.find_contributions(light)) for light in self.light_layers)
+
+    def find_contributions(self, light_choice):
+        light_name = light_choice.replace("RGBA_", "")
+        return [layer for layer in self.contribution_layers if light_name in layer]
+
+    def get_contributions(self, light_choice):
+        """Return the contribution layers of a light, e.g. RGBA_key -> CONT_specular_direct_key, ..."""
+        contributions = self.contributions.get(light_choice)
+        if contributions is None:
+            contributions = self.contributions[light_choice] = self.find_contributions(light_choice)
+        return contributions
+
+
+def get_contribution_index(input_node):
+    """
+    Return the ContributionIndex of a node's channels, built once per channel set
+    and viewer pass filters, and shared by every contribution node reading them.
+    """
+    preferences = load_viewerpass_preferences()
+    filters = (tuple(preferences.get("Light Pass", [])), tuple(preferences.get("Contribution Pass", [])))
+    layer_index = layerindex.get_layer_index(input_node)
+    key = (layer_index.fingerprint, filters)
+
+    index = _contribution_indexes.get(key)
+    if index is not None:
+        _contribution_indexes.move_to_end(key)
+        return index
+
+    index = ContributionIndex(layer_index.layer_names(), *filters)
+    _contribution_indexes[key] = index
+    if len(_contribution_indexes) > MAX_CONTRIBUTION_INDEXES:
+        _contribution_indexes.popitem(last=False)
+    return index
 
 
 #------------------------------------------------------------------------------#
 #----------------------------------------------------------------- CALLBACKS --#
 
 def knobChanged():
-    print("knobChanged triggered")
-
     n = nuke.thisNode()
     k = nuke.thisKnob()
 
-    if k is None:
-        print("knobChanged appelé sans knob valide !")
+    # Changes made by the updates themselves
+    if k is None or n.fullName() in _updating_nodes:
         return
 
-    print(f"Knob: {k.name()}, Value: {k.value()}")
-
     if k.name() == "inputChange":
-        input_node = n.input(0)
-        if input_node:
-            light_layers = get_layers(input_node, category="Light Pass")
+        schedule_input_update(n)
 
-            print(f"Light layers found: {light_layers}")
-            n["layer_layer_light_choice"].setValues(light_layers)
+    elif k.name() == "layer_layer_light_choice":
+        run_update(n, update_light_choice)
 
-            light_shuffle_node = n.node("light_shuffle")
-            if light_shuffle_node:
-                light_shuffle_node["in1"].setValue(n["layer_layer_light_choice"].value())
+    elif k.name() == "layer_layer_contribution_choice":
+        run_update(n, update_contribution_choice)
 
-            populate_contribution(n, input_node)
-
-    if k.name() == "layer_layer_light_choice":
-        input_node = n.input(0)  # Vérifie que le nœud d'entrée est bien défini
-        if input_node:
-            populate_contribution(n, input_node)
-
-        light_shuffle_node = n.node("light_shuffle")
-        if light_shuffle_node:
-            light_shuffle_node["in1"].setValue(n["layer_layer_light_choice"].value())
-
-    if k.name() == "layer_layer_contribution_choice":
-        contribution_node = n.node("contribution_shuffle")
-        if contribution_node:
-            contribution_node["in1"].setValue(n["layer_layer_contribution_choice"].value())
 
+def onDestroy():
+    """Forget the applied index and the pending update of a deleted contribution node."""
+    node_name = nuke.thisNode().fullName()
+    _applied_indexes.pop(node_name, None)
+    _pending_nodes.pop(node_name, None)
 
 
 #------------------------------------------------------------------------------#
 #----------------------------------------------------------------- FUNCTIONS --#
 
-def populate_contribution(node, input_node):
+def populate_contribution(node, input_node, contribution_index=None):
     if input_node is None:
         print("⚠️ populate_contribution appelé sans input_node valide")
         return
 
     contribution_shuffle_node = node.node("contribution_shuffle")
-    contribution_in_node = node.node("contribution_shuffle_in")
 
     light_choice = node["layer_layer_light_choice"].value()
-    contribution_layers = get_layers(input_node, category="Contribution Pass")
+    contribution_index = contribution_index or get_contribution_index(input_node)
 
-    # Filtrer les layers correspondant à la sélection de light_choice
-    filtered_contribution_layers = [layer for layer in contribution_layers if light_choice.replace("RGBA_", "") in layer]
+    # Layers contribution de la sélection de light_choice (index précalculé)
+    filtered_contribution_layers = contribution_index.get_contributions(light_choice)
 
     if not filtered_contribution_layers:
         print("⚠️ Aucun layer contribution trouvé")
         return
 
     # Met à jour le Pulldown Choice sans inclure "none"
-    node["layer_layer_contribution_choice"].setValues(filtered_contribution_layers)
+    set_knob_values(node["layer_layer_contribution_choice"], filtered_contribution_layers)
 
     # Sélectionne automatiquement le premier layer contribution
     default_contribution = filtered_contribution_layers[0]
-    node["layer_layer_contribution_choice"].setValue(default_contribution)
-    print(f"Default contribution selected: {default_contribution}")
+    set_knob_value(node["layer_layer_contribution_choice"], default_contribution)
 
     # Mise à jour du Shuffle avec le layer par défaut
-    if contribution_shuffle_node:
-        contribution_shuffle_node["in1"].setValue(default_contribution)
+    if contribution_shuffle_node and set_knob_value(contribution_shuffle_node["in1"], default_contribution):
         contribution_shuffle_node["mappings"].setValue([
             (f"{default_contribution}.red", "rgba.red"),
             (f"{default_contribution}.green", "rgba.green"),
             (f"{default_contribution}.blue", "rgba.blue")
         ])
 
-    refresh_ui("layer_layer_contribution_choice")
 
-def refresh_ui(knob_name):
-    knob = nuke.thisNode()[knob_name]
-    knob.setEnabled(False)  # Trick pour rafraîchir l'UI
-    knob.setEnabled(True)
+def set_knob_value(knob, value):
+    """Set the value of a knob only when it differs, return True when it changed."""
+    if knob.value() == value:
+        return False
+    knob.setValue(value)
+    return True
+
+
+def set_knob_values(knob, values):
+    """Set the menu items of a pulldown only when they differ."""
+    if list(knob.values()) != list(values):
+        knob.setValues(values)
+
+
+def run_update(node, update):
+    """Run an update of a contribution node, ignoring the knobChanged it triggers on it."""
+    node_name = node.fullName()
+    _updating_nodes.add(node_name)
+    try:
+        update(node)
+    finally:
+        _updating_nodes.discard(node_name)
+
+
+def schedule_input_update(node):
+    """
+    Queue the update of a contribution node whose input changed. The nodes queued
+    during one event loop tick, e.g. while a script loads or gets re-wired, are
+    updated once each on the next one.
+    """
+    if not nuke.GUI:
+        run_update(node, update_input)
+        return
+
+    first = not _pending_nodes
+    _pending_nodes[node.fullName()] = node
+    if first:
+        nuke.executeInMainThread(flush_input_updates)
+
+
+def flush_input_updates():
+    while _pending_nodes:
+        node_name, _ = _pending_nodes.popitem(last=False)
+        # Skip the nodes deleted in the meantime
+        node = nuke.toNode(node_name)
+        if node is None:
+            continue
+        # A failed update must not leave the queue stuck for the session
+        try:
+            run_update(node, update_input)
+        except Exception as e:
+            print(f"Error updating {node_name}: {str(e)}")
+
+
+def update_input(node):
+    """Update the light pulldown of a contribution node, unless its input channels did not change."""
+    node_name = node.fullName()
+    input_node = node.input(0)
+    if input_node is None:
+        _applied_indexes.pop(node_name, None)
+        return
+
+    contribution_index = get_contribution_index(input_node)
+    if _applied_indexes.get(node_name) is contribution_index:
+        return
+    _applied_indexes[node_name] = contribution_index
+
+    set_knob_values(node["layer_layer_light_choice"], contribution_index.light_layers)
+    update_light_choice(node, contribution_index)
+
+
+def update_light_choice(node, contribution_index=None):
+    input_node = node.input(0)
+    if input_node:
+        populate_contribution(node, input_node, contribution_index)
+
+    light_shuffle_node = node.node("light_shuffle")
+    if light_shuffle_node:
+        set_knob_value(light_shuffle_node["in1"], node["layer_layer_light_choice"].value())
+
+
+def update_contribution_choice(node):
+    contribution_node = node.node("contribution_shuffle")
+    if contribution_node:
+        set_knob_value(contribution_node["in1"], node["layer_layer_contribution_choice"].value())
 
 
 
@@ -152,8 +261,10 @@ def refresh_ui(knob_name):
 
 # Automatically link this script to the gizmo
 def register_contribution():
-    """Register the gizmo and ensure the script is loaded."""
+    """Register the gizmo callbacks, menu.py registers lazy stubs of them instead."""
     nuke.addOnUserCreate(knobChanged, nodeClass="contribution")
+    nuke.addOnCreate(onCreate, nodeClass="contribution")
+    nuke.addOnDestroy(onDestroy, nodeClass="contribution")
 
 def initialize_knobs(node):
     light_shuffle_node = node.node("light_shuffle")
@@ -166,4 +277,8 @@ def initialize_knobs(node):
         contribution_shuffle_node["in"].setValue("none")
 
 
-nuke.addOnCreate(initialize_knobs, nodeClass="contribution")
\ No newline at end of file
+def onCreate():
+    """Initialise a new contribution node, deferred to its first use while a script loads."""
+    node = nuke.thisNode()
+    if not deferredinit.defer(node, initialize_knobs):
+        initialize_knobs(node)
\ No newline at end of file
@@ -0,0 +1,102 @@
+#------------------------------------------------------------------------------#
+#-------------------------------------------------------------------- HEADER --#
+
+"""
+:synopsis:
+    Deferred initialisation of the contribution and GradeAOV nodes during a script load.
+
+    While a script loads in the GUI, the creation callbacks of these gizmos only
+    record the node instead of doing their UI work. A deferred node is initialised the first
+    time its panel is opened or its input changes, and the number of deferred
+    nodes is reported once the script is loaded.
+"""
+
+#------------------------------------------------------------------------------#
+#------------------------------------------------------------------- IMPORTS --#
+
+from collections import OrderedDict
+
+import nuke
+
+# ---------------------------------------------------------------------------- #
+# ----------------------------------------------------------------- GLOBALS -- #
+
+# Knob changes initialising a deferred node
+INITIALIZE_KNOBS = ["showPanel", "inputChange"]
+
+_state = {"loading": False}
+
+# Full name -> initialisation function of the nodes waiting for their first use
+_deferred_nodes = OrderedDict()
+
+#------------------------------------------------------------------------------#
+#----------------------------------------------------------------- FUNCTIONS --#
+
+def is_loading():
+    return _state["loading"]
+
+
+def begin_script_load():
+    """
+    Start deferring, called when the root of a script is created.
+
+    Only the GUI defers: without panels to open and without an event loop to end a
+    new script, which has no script load callback, `nuke -t` initialises every node.
+    """
+    if not nuke.GUI:
+        return
+    _state["loading"] = True
+    # Also ends a new script, which has no script load callback
+    nuke.executeInMainThread(end_script_load)
+
+
+def end_script_load():
+    """Stop deferring and report the nodes left to initialise."""
+    if not _state["loading"]:
+        return
+    _state["loading"] = False
+    if _deferred_nodes:
+        print(f"Layer Manager: {len(_deferred_nodes)} nodes deferred during script load")
+
+
+def defer(node, initialize):
+    """
+    Record initialize(node) for the first use of the node while a script loads.
+    Return True when deferred, False when the caller should initialise it now.
+    """
+    if not _state["loading"]:
+        return False
+    _deferred_nodes[node.fullName()] = initialize
+    return True
+
+
+def initialize(node):
+    """Run the deferred initialisation of a node, return True when it had one."""
+    initialize_node = _deferred_nodes.pop(node.fullName(), None)
+    if initialize_node is None:
+        return False
+    initialize_node(node)
+    return True
+
+
+def deferred_count():
+    return len(_deferred_nodes)
+
+
+#------------------------------------------------------------------------------#
+#----------------------------------------------------------------- CALLBACKS --#
+
+def knobChanged():
+    """Initialise a deferred node when its panel opens or its input changes."""
+    if not _deferred_nodes:
+        return
+    k = nuke.thisKnob()
+    if k is not None and k.name() in INITIALIZE_KNOBS:
+        initialize(nuke.thisNode())
+
+
+def register(node_classes=("contribution", "gradeaov")):
+    nuke.addOnCreate(begin_script_load, nodeClass="Root")
+    nuke.addOnScriptLoad(end_script_load)
+    for node_class in node_classes:
+        nuke.addKnobChanged(knobChanged, nodeClass=node_class)
@@ -11,7 +11,10 @@
 #------------------------------------------------------------------- IMPORTS --#
 
 
+import json
+import re
 import nuke
+import deferredinit
 
 
 # ---------------------------------------------------------------------------- #
@@ -21,6 +24,28 @@ DEFAULT_COLOR = 25599999
 WARNING_COLOR = 2610898687
 ERROR_COLOR = 2671189247
 
+# Layer slots of a GradeAOV, "layer_0" to "layer_10", each one with these knobs
+MAX_LAYERS = 11
+SLOT_KNOBS = ["link", "remove", "mute", "solo"]
+# Script of the slot buttons, calling remove_layer, mute_layer and solo_layer
+SLOT_BUTTONS = ["remove", "mute", "solo"]
+SLOT_SCRIPT = "import gradeaov\ngradeaov.{1}_layer('{0}')"
+
+# Hidden knob with the nodes of each used slot: {"layer_0": {"out": ..., "in": ..., "dot": ...}}
+REGISTRY_KNOB = "layer_registry"
+SLOT_NODES = ["out", "in", "dot"]
+# Disable state of a slot merge before a solo, restored by the unsolo
+SOLO_PREVIOUS = "solo_previous"
+
+MUTE_LABEL = "<font size=3 color=White>Mute"
+MUTED_LABEL = "<font size=3 color=Red>Mute"
+SOLO_LABEL = "<font size=3 color=White>Solo"
+SOLOED_LABEL = "<font size=3 color=Red>Solo"
+
+DEFAULT_AUTOLABEL = "nuke.thisNode().name() + \"\\n\" + nuke.thisNode()['settings_label_input'].value()"
+# One autolabel line per layer: + "\n" + nuke.thisNode()["layer_0_link"].value()
+AUTOLABEL_LAYER_RE = re.compile(r'\s*\+\s*"\\n"\s*\+\s*nuke\.thisNode\(\)\["layer_\d+_link"\]\.value\(\)')
+
 #------------------------------------------------------------------------------#
 #----------------------------------------------------------------- CALLBACKS --#
 
@@ -73,24 +98,154 @@ class NodeCoord(object):
             self.cent_x = self.x + (self.width // 2)
             self.cent_y = self.y + (self.height // 2)
 
-def add_layer():
-    """This will add an entry to let the user chose a layer to GradeAOV"""
-    # Get this node
-    for node in nuke.allNodes():
-        node['selected'].setValue(False)
-    n = nuke.thisNode()
+def get_slot_knob_names(layer_name):
+    return ["{0}_{1}".format(layer_name, kind) for kind in SLOT_KNOBS]
 
-    # Get current layer name and +1 for next layer
-    layer_count = n["layer_count"].value()
 
-    # Check to limit the layer to 10 since some artist abuse it !
-    if layer_count >= 11:
-        nuke.message("No Dayne.... No!")
+def create_slot_knobs(layer_name):
+    """Return the link, remove, mute and solo knobs of a slot, calling this module."""
+    layer_link_knob = nuke.Link_Knob("{0}_link".format(layer_name))
+    layer_link_knob.setLabel("<font size=3 color=White>Layer:")
+
+    remove_knob = nuke.PyScript_Knob("{0}_remove".format(layer_name), "X")
+    remove_knob.setLabel("<font size=3 color=White>X")
+    remove_knob.setValue(SLOT_SCRIPT.format(layer_name, "remove"))
+    remove_knob.clearFlag(nuke.STARTLINE)
+
+    mute_knob = nuke.PyScript_Knob("{0}_mute".format(layer_name), "mute")
+    mute_knob.setLabel(MUTE_LABEL)
+    mute_knob.setValue(SLOT_SCRIPT.format(layer_name, "mute"))
+
+    solo_knob = nuke.PyScript_Knob("{0}_solo".format(layer_name), "solo")
+    solo_knob.setLabel(SOLO_LABEL)
+    solo_knob.setValue(SLOT_SCRIPT.format(layer_name, "solo"))
+
+    return [layer_link_knob, remove_knob, mute_knob, solo_knob]
+
+
+def update_slot_scripts(n):
+    """
+    Point the slot buttons of older GradeAOVs to this module. Their scripts called
+    the functions their gizmo used to define inline.
+    """
+    knobs = n.knobs()
+    for slot in range(MAX_LAYERS):
+        layer_name = "layer_{}".format(slot)
+        for kind in SLOT_BUTTONS:
+            knob = knobs.get("{0}_{1}".format(layer_name, kind))
+            script = SLOT_SCRIPT.format(layer_name, kind)
+            if knob is not None and knob.value() != script:
+                knob.setValue(script)
+
+
+def ensure_slots(n):
+    """
+    Create the hidden knobs of every layer slot right after aovs_layers_text.
+
+    This reorders the trailing knobs once per node, adding a layer afterwards only
+    shows the knobs of a free slot. Knobs of layers added by older versions are kept,
+    their buttons calling this module.
+    """
+    update_slot_scripts(n)
+    knobs = n.knobs()
+    if REGISTRY_KNOB not in knobs:
+        set_registry(n, build_registry(n))
+
+    slot_names = [get_slot_knob_names("layer_{}".format(slot)) for slot in range(MAX_LAYERS)]
+    if all(name in knobs for names in slot_names for name in names):
         return
 
-    layer_name = "layer_{}".format(int(layer_count))
-    n["layer_count"].setValue(layer_count + 1)
+    knob_list = [knob.name() for knob in n.allKnobs()]
+    insert_index = knob_list.index("aovs_layers_text") + 1
+    all_slot_names = set(name for names in slot_names for name in names)
+    trailing_knobs = [knobs[name] for name in knob_list[insert_index:] if name not in all_slot_names]
+
+    slot_knobs = []
+    for slot, names in enumerate(slot_names):
+        layer_name = "layer_{}".format(slot)
+        if all(name in knobs for name in names):
+            slot_knobs.append([knobs[name] for name in names])
+        else:
+            new_knobs = create_slot_knobs(layer_name)
+            for knob in new_knobs:
+                knob.setVisible(False)
+            slot_knobs.append(new_knobs)
+
+    for knob in trailing_knobs:
+        n.removeKnob(knob)
+    for knob in (knob for knobs_of_slot in slot_knobs for knob in knobs_of_slot):
+        if knob.name() in knobs:
+            n.removeKnob(knob)
+    for knobs_of_slot in slot_knobs:
+        for knob in knobs_of_slot:
+            n.addKnob(knob)
+    for knob in trailing_knobs:
+        n.addKnob(knob)
+
+
+def get_slot_index(layer_name):
+    return int(layer_name.rpartition("_")[2])
+
+
+def build_registry(n):
+    """Return the registry of a GradeAOV made before it had one, from the names of its nodes."""
+    registry = {}
+    with n:
+        for slot in range(MAX_LAYERS):
+            layer_name = "layer_{}".format(slot)
+            nodes = dict((role, nuke.toNode("{0}_{1}".format(layer_name, role))) for role in SLOT_NODES)
+            if nodes["out"] is not None:
+                registry[layer_name] = dict((role, node.name()) for role, node in nodes.items() if node is not None)
+    return registry
+
+
+def get_registry(n):
+    """Return the slot registry of a GradeAOV."""
+    if REGISTRY_KNOB not in n.knobs():
+        return build_registry(n)
+    try:
+        return json.loads(n[REGISTRY_KNOB].value() or "{}")
+    except ValueError:
+        return build_registry(n)
+
+
+def set_registry(n, registry):
+    if REGISTRY_KNOB not in n.knobs():
+        knob = nuke.String_Knob(REGISTRY_KNOB, REGISTRY_KNOB)
+        knob.setFlag(nuke.INVISIBLE)
+        n.addKnob(knob)
+    n[REGISTRY_KNOB].setValue(json.dumps(registry, sort_keys=True))
 
+
+def get_used_slots(n, registry=None):
+    """Return the layer names of the slots holding a layer, in slot order."""
+    registry = get_registry(n) if registry is None else registry
+    return sorted(registry, key=get_slot_index)
+
+
+def get_free_slots(n, registry=None):
+    """Return the layer names of the free slots, in slot order."""
+    registry = get_registry(n) if registry is None else registry
+    return ["layer_{}".format(slot) for slot in range(MAX_LAYERS) if "layer_{}".format(slot) not in registry]
+
+
+def get_slot_node(n, layer_name, role="out", registry=None):
+    """Return the out, in or dot node of a slot, None when the slot is free."""
+    registry = get_registry(n) if registry is None else registry
+    node_name = registry.get(layer_name, {}).get(role)
+    if not node_name:
+        return None
+    with n:
+        return nuke.toNode(node_name)
+
+
+def set_slot_visible(n, layer_name, visible):
+    for knob_name in get_slot_knob_names(layer_name):
+        n[knob_name].setVisible(visible)
+
+
+def build_layer_nodes(layer_name):
+    """Create the merge out, merge in and dot of a layer in the current group."""
     # Get builders node and their top node
     out_builder_node = nuke.toNode("out_builder_dot")
     out_builder_top_node = out_builder_node.input(0)
@@ -102,12 +257,8 @@ def add_layer():
     in_builder_top_node = in_builder_node.input(0)
 
     ### CREATE MERGE OUT NODEs
-    # Create Nodes
-    merge_out_node = create_node("Merge2")
-    merge_out_node["name"].setValue("{0}_out".format(layer_name))
-    merge_out_node["operation"].setValue("plus")
+    merge_out_node = nuke.nodes.Merge2(name="{0}_out".format(layer_name), operation="plus", output="rgb")
     merge_out_node["Achannels"].setValue("none")
-    merge_out_node["output"].setValue("rgb")
     merge_out_node["knobChanged"].setValue("layer_link_autolabel= '{0}'\n"
                           "layer_knobChanged()")
 
@@ -124,10 +275,7 @@ def add_layer():
     out_builder_node.setInput(0, merge_out_node)
 
     ### CREATE MERGE IN NODES
-    # Create it
-    merge_in_node = create_node("Merge2")
-    merge_in_node["name"].setValue("{0}_in".format(layer_name))
-    merge_in_node["operation"].setValue("copy")
+    merge_in_node = nuke.nodes.Merge2(name="{0}_in".format(layer_name), operation="copy")
     merge_in_node["Achannels"].setExpression("{0}.Achannels".format(merge_out_node.name()))
     merge_in_node["Bchannels"].setValue("none")
 
@@ -141,8 +289,7 @@ def add_layer():
     merge_in_node["output"].setFlag(0x00000001)
     merge_in_node["output"].setFlag(0x00000002)
 
-    merge_in_dot = create_node("Dot")
-    merge_in_dot["name"].setValue("{0}_dot".format(layer_name))
+    merge_in_dot = nuke.nodes.Dot(name="{0}_dot".format(layer_name))
 
     # Move it
     under(merge_in_node, in_builder_top_node, offset=24)
@@ -154,70 +301,71 @@ def add_layer():
     in_builder_node.setInput(0, merge_in_node)
     merge_in_dot.setInput(0, graded_builder_top_node)
     graded_builder_node.setInput(0, merge_in_dot)
+    return merge_out_node, merge_in_node, merge_in_dot
 
 
-    ### CREATE UI ENTRY
-    # Name it
-    layer_link_name = "{0}_link".format(layer_name)
+def update_autolabel(n, registry=None):
+    """Rewrite the autolabel with one line per used slot, keeping its custom start."""
+    autolabel = AUTOLABEL_LAYER_RE.sub("", n["autolabel"].value()).rstrip() or DEFAULT_AUTOLABEL
+    for layer_name in get_used_slots(n, registry):
+        autolabel += ' + "\\n" + nuke.thisNode()["{0}_link"].value()'.format(layer_name)
+    n["autolabel"].setValue(autolabel)
 
-    # Create it
 
-    layer_link_knob = nuke.Link_Knob("")
-    layer_link_knob.setName(layer_link_name)
-    layer_link_knob.setLabel("<font size=3 color=White>Layer:")
-    layer_link_knob.setValue("none")
-
-    # Link it
-    layer_link_knob.makeLink(merge_out_node.name(), "Achannels")
-
-    # Autolabel entry
-    layer_link_autolabel = '+ nuke.thisNode()["{0}"].value()'.format(layer_link_name)
-
-    # Remove Button
-    remove_knob = nuke.PyScript_Knob("{0}_remove".format(layer_name), "X")
-    remove_knob.setLabel("<font size=3 color=White>X")
-    remove_knob.setValue("layer_link_autolabel= '{0}'\n"
-                          "remove_layer('{1}', layer_link_autolabel)".format(layer_link_autolabel,
-                                                                                      layer_name))
-    remove_knob.clearFlag(nuke.STARTLINE)
+def add_layers(n, layers):
+    """
+    Add one entry per layer to the GradeAOV, in its free slots, in one pass.
 
-    # Mute knob
-    mute_knob = nuke.PyScript_Knob("{0}_mute".format(layer_name), "mute")
-    mute_knob.setValue("mute_layer('{0}')".format(layer_name))
-    mute_knob.setLabel("<font size=3 color=White>Mute")
+    The merges of every layer are chained inside the group, then the knobs of their
+    slots are shown, with a single layer count update and autolabel rewrite.
+    A None layer adds an empty entry. Return the slot layer names used.
+    """
+    ensure_slots(n)
 
-    # Reorder knobs to insert them at the correct position
-    knob_list = list(n.knobs().keys())
-    insert_index = knob_list.index("aovs_layers_text") + 1
+    # Limit the layers since some artist abuse it !
+    registry = get_registry(n)
+    free_slots = get_free_slots(n, registry)
+    if len(layers) > len(free_slots):
+        nuke.message("No Dayne.... No!")
+    slots = list(zip(free_slots, layers))
+    if not slots:
+        return []
 
-    # Temporarily remove all knobs after the insertion point
-    knobs_to_readd = []
-    for i in range(insert_index, len(knob_list)):
-        knob_name = knob_list[i]
-        knobs_to_readd.append(n.knobs()[knob_name])
-        n.removeKnob(n.knobs()[knob_name])
+    with n:
+        slot_nodes = [build_layer_nodes(layer_name) for layer_name, _ in slots]
 
+    # Register the slots, link them to their merge and show them
+    for (layer_name, layer), nodes in zip(slots, slot_nodes):
+        registry[layer_name] = dict((role, node.name()) for role, node in zip(SLOT_NODES, nodes))
+        n["{0}_link".format(layer_name)].makeLink(nodes[0].name(), "Achannels")
+        set_slot_visible(n, layer_name, True)
+        if layer:
+            n["{0}_link".format(layer_name)].setValue(layer)
 
-    # Add knobs
-    n.addKnob(layer_link_knob)
-    n.addKnob(remove_knob)
-    n.addKnob(mute_knob)
+    set_registry(n, registry)
+    n["layer_count"].setValue(len(registry))
+    update_autolabel(n, registry)
+    return [layer_name for layer_name, _ in slots]
 
-    for knob in knobs_to_readd:
-        n.addKnob(knob)
 
-    ### AUTOLABEL
-    # check if there is already an autolabel.
-    # If yes, take the current state of autolable knob instead of the node name
-    node_name = "nuke.thisNode().name() + \"\\n\" + nuke.thisNode()['settings_label_input'].value()"
-    if n["autolabel"].value():
-        node_name = n["autolabel"].value()
+def add_layer(n=None, layer=None):
+    """
+    Add an entry to let the user chose a layer to GradeAOV, in the first free slot.
 
-    #set the autolabel field with the updated link name
-    n['autolabel'].setValue("{0} {1}".format(node_name, "+ \"\\n\" {0}".format(layer_link_autolabel)))
+    Only the nodes inside the GradeAOV are created, and the knobs of the slot are shown
+    instead of rebuilding the knob list. Return the slot layer name, None when full.
+    """
+    slots = add_layers(n or nuke.thisNode(), [layer])
+    return slots[0] if slots else None
 
 def onCreate():
+    """Check the layers of a new GradeAOV, deferred to its first use while a script loads."""
     n = nuke.thisNode()
+    if not deferredinit.defer(n, initialize_node):
+        initialize_node(n)
+
+def initialize_node(n):
+    update_slot_scripts(n)
     knobs = n.knobs()
     for knob in knobs:
         if "_link" in knob:
@@ -255,51 +403,129 @@ def basic_move(node, target, x=0, y=0):
 def under(node, target, offset=100):
     basic_move(node, target, y=offset)
 
-def remove_layer(layer_name, autolabel):
-    " function to delete entry in the node"
-    # Get this node
-    n = nuke.thisNode()
+def remove_slots(n, layer_names):
+    """Delete the registered nodes of the slots and hide their knobs, with one registry update."""
+    registry = get_registry(n)
+    if any(SOLO_PREVIOUS in registry.get(layer_name, {}) for layer_name in layer_names):
+        restore_solo(n, registry)
+
+    with n:
+        for layer_name in layer_names:
+            slot = registry.pop(layer_name, {})
+            for role in SLOT_NODES:
+                node = nuke.toNode(slot[role]) if slot.get(role) else None
+                if node is not None:
+                    nuke.delete(node)
+
+    for layer_name in layer_names:
+        if all(knob_name in n.knobs() for knob_name in get_slot_knob_names(layer_name)):
+            reset_slot_knobs(n, layer_name)
+            set_slot_visible(n, layer_name, False)
+        else:
+            for knob_name in get_slot_knob_names(layer_name):
+                if knob_name in n.knobs():
+                    n.removeKnob(n.knobs()[knob_name])
+
+    set_registry(n, registry)
+    n["layer_count"].setValue(len(registry))
+    update_autolabel(n, registry)
+    update_isolate_switch(n, registry)
+
+def remove_layer(layer_name, autolabel=None):
+    """Delete the nodes of a layer and hide its slot, the autolabel argument is kept for older buttons."""
+    remove_slots(nuke.thisNode(), [layer_name])
 
-    # Update autolabel
-    autolabel_list = n["autolabel"].value()
-    new_list = autolabel_list.replace("+ \"\\n\" {0}".format(autolabel), "")
-    n["autolabel"].setValue(new_list)
-
-    # Remove knobs
-    n.removeKnob(n.knobs()["{0}_mute".format(layer_name)])
-    n.removeKnob(n.knobs()["{0}_link".format(layer_name)])
-    n.removeKnob(n.knobs()["{0}_remove".format(layer_name)])
-    # Remove node
-    nodes = nuke.allNodes()
-    for node in nodes:
-        if layer_name in node.name():
-            nuke.delete(node)
+def reset_slot_knobs(n, layer_name):
+    n["{0}_mute".format(layer_name)].setLabel(MUTE_LABEL)
+    n["{0}_solo".format(layer_name)].setLabel(SOLO_LABEL)
+    n["{0}_link".format(layer_name)].setEnabled(True)
 
 def clear_all():
-    remove_buttons = [r for r in nuke.thisNode().knobs() if '_remove' in r]
-    for r in remove_buttons:
-        nuke.thisNode()[r].execute()
-        nuke.thisNode()["layer_count"].setValue(0)
+    n = nuke.thisNode()
+    remove_slots(n, get_used_slots(n))
 
 def mute_layer(layer_name):
     node = nuke.thisNode()
-    merge_node = nuke.toNode("{0}_out".format(layer_name))
+    merge_node = get_slot_node(node, layer_name)
+    if merge_node is None:
+        return
     node_state = merge_node["disable"].value()
     if node_state:
-        node["{0}_mute".format(layer_name)].setLabel("<font size=3 color=White>Mute")
+        node["{0}_mute".format(layer_name)].setLabel(MUTE_LABEL)
         node["{0}_link".format(layer_name)].setEnabled(True)
         merge_node["disable"].setValue(0)
     else:
-        node["{0}_mute".format(layer_name)].setLabel("<font size=3 color=Red>Mute")
+        node["{0}_mute".format(layer_name)].setLabel(MUTED_LABEL)
         node["{0}_link".format(layer_name)].setEnabled(False)
         merge_node["disable"].setValue(1)
 
+def solo_layer(layer_name):
+    set_solo(nuke.thisNode(), layer_name)
+
+def set_solo(node, layer_name):
+    """
+    Toggle the solo of a slot. Soloing disables the merge of every other slot and records
+    their previous state, unsoloing restores it, so muted slots stay muted.
+    """
+    registry = get_registry(node)
+    solo_active = node["{0}_solo".format(layer_name)].label() == SOLOED_LABEL
+
+    # Back to the state before any previous solo
+    restore_solo(node, registry)
+
+    for layer in get_used_slots(node, registry):
+        if solo_active:
+            # Turn solo off and enable the other layers again, muted ones keep their link disabled
+            node["{0}_mute".format(layer)].setEnabled(True)
+            node["{0}_solo".format(layer)].setLabel(SOLO_LABEL)
+            continue
+
+        merge_node = get_slot_node(node, layer, registry=registry)
+        if merge_node is not None:
+            registry[layer][SOLO_PREVIOUS] = int(merge_node["disable"].value())
+            merge_node["disable"].setValue(0 if layer == layer_name else 1)
+
+        if layer == layer_name:
+            node["{0}_solo".format(layer)].setLabel(SOLOED_LABEL)
+            node["{0}_mute".format(layer)].setEnabled(True)
+            node["{0}_link".format(layer)].setEnabled(True)
+        else:
+            node["{0}_solo".format(layer)].setLabel(SOLO_LABEL)
+            node["{0}_mute".format(layer)].setEnabled(False)
+            node["{0}_link".format(layer)].setEnabled(False)
+
+    set_registry(node, registry)
+    update_isolate_switch(node, registry)
+
+def restore_solo(node, registry):
+    """Give back their disable state from before the solo to the slot merges."""
+    for layer in get_used_slots(node, registry):
+        if SOLO_PREVIOUS not in registry[layer]:
+            continue
+        previous = registry[layer].pop(SOLO_PREVIOUS)
+        merge_node = get_slot_node(node, layer, registry=registry)
+        if merge_node is not None:
+            merge_node["disable"].setValue(previous)
+        node["{0}_mute".format(layer)].setLabel(MUTED_LABEL if previous else MUTE_LABEL)
+        node["{0}_link".format(layer)].setEnabled(not previous)
+
+def update_isolate_switch(node, registry=None):
+    with node:
+        isolate_switch = nuke.toNode("isolate_layer_switch")
+    if isolate_switch is None:
+        return
+    solo_knobs = ["{0}_solo".format(layer_name) for layer_name in get_used_slots(node, registry)]
+    solo_active = any(node[knob_name].label() == SOLOED_LABEL for knob_name in solo_knobs if knob_name in node.knobs())
+    isolate_switch["which"].setValue(1 if solo_active else 0)
+
 def clear_muted():
     n = nuke.thisNode()
-    nodes = nuke.allNodes()
-    for node in nodes:
-        if "_out" in node.name():
-            node["disable"].setValue(0)
-            node["Achannels"].setEnabled(True)
-            n[node.name().replace("_out", "_mute")].setLabel("<font size=3 color=White>Mute")
-
+    registry = get_registry(n)
+    for layer_name in get_used_slots(n, registry):
+        node = get_slot_node(n, layer_name, registry=registry)
+        if node is None:
+            continue
+        node["disable"].setValue(0)
+        node["Achannels"].setEnabled(True)
+        n["{0}_mute".format(layer_name)].setLabel(MUTE_LABEL)
+        n["{0}_link".format(layer_name)].setEnabled(True)
@@ -0,0 +1,163 @@
+#------------------------------------------------------------------------------#
+#-------------------------------------------------------------------- HEADER --#
+
+"""
+:synopsis:
+    Headless layer classification core of the Layer Manager.
+
+    Sorts the layers of a node into the Light, Mask, Tech, Utility and custom
+    sections defined in the preferences. This module has no Qt or nuke
+    dependency, so it can be benchmarked and tested outside a Nuke session
+    (see benchmarks/benchmark_classification.py and tests/test_layerclassifier.py).
+"""
+
+#------------------------------------------------------------------------------#
+#------------------------------------------------------------------- IMPORTS --#
+
+import re
+import layerindex
+from collections import OrderedDict
+
+# ---------------------------------------------------------------------------- #
+# ----------------------------------------------------------------- GLOBALS -- #
+
+# Preference keys of the sections, in the order of LayerManagerUI.current_section
+SECTION_KEYS = ["Light Layer", "Mask Layer", "Tech Layer", "Utility Layer", "custom Layer"]
+
+#------------------------------------------------------------------------------#
+#----------------------------------------------------------------- FUNCTIONS --#
+
+class LayerClassifier(object):
+
+    """
+    Compiled layer classifier built once from the preferences dict.
+
+    The exclusion and section keywords are compiled into one regex per list, so every
+    layer is assigned to its sections in a single pass:
+    - Layers containing an exclusion keyword are dropped
+    - "custom Layer" keywords take priority over every other section
+    - A layer can belong to several of the Light, Mask, Tech and Utility sections
+    - Unclassified layers fall back to the Tech section
+    """
+
+    def __init__(self, preferences):
+        self.exclusion_matcher = self.compile_substrings(preferences.get("Exclusion Keywords", []))
+        self.section_matchers = [(section, self.compile_section(preferences.get(section, [])))
+                                 for section in SECTION_KEYS]
+
+    @staticmethod
+    def compile_substrings(keywords):
+        """Compile keywords into a single regex matching any of them as a substring."""
+        # Blank keywords would match every layer, they are ignored
+        keywords = [kw for kw in keywords if kw]
+        if not keywords:
+            return None
+        # Longest first so the alternation never stops on a shorter keyword
+        keywords = sorted(set(keywords), key=len, reverse=True)
+        return re.compile("|".join(re.escape(kw) for kw in keywords))
+
+    @classmethod
+    def compile_section(cls, keywords):
+        """
+        Compile section keywords into (single characters, substring regex).
+
+        One character keywords only match the whole layer name or its prefix, longer
+        keywords match anywhere in the layer name (which also covers prefix equality).
+        """
+        single_chars = frozenset(kw for kw in keywords if len(kw) == 1)
+        return single_chars, cls.compile_substrings([kw for kw in keywords if len(kw) > 1])
+
+    @staticmethod
+    def get_prefix(layer):
+        """Main prefix of a layer (up to the next '_' or '-')."""
+        if '_' in layer:
+            return layer.split('_', 1)[0]
+        elif '-' in layer:
+            return layer.split('-', 1)[0]
+        return layer
+
+    def matches(self, layer, prefix, matcher):
+        single_chars, substrings = matcher
+        if single_chars and (layer in single_chars or prefix in single_chars):
+            return True
+        return substrings is not None and substrings.search(layer) is not None
+
+    def classify(self, layers):
+        """Return a section -> sorted layers map for the given layer names."""
+        sections = {section: [] for section in SECTION_KEYS}
+        custom_section, custom_matcher = self.section_matchers[-1]
+        other_matchers = self.section_matchers[:-1]
+        exclusion_matcher = self.exclusion_matcher
+
+        for layer in set(layers):
+            if exclusion_matcher is not None and exclusion_matcher.search(layer):
+                continue
+            prefix = self.get_prefix(layer)
+
+            # Prioritize keywords "custom Layer"
+            if self.matches(layer, prefix, custom_matcher):
+                sections[custom_section].append(layer)
+                continue
+
+            classified = False
+            for section, matcher in other_matchers:
+                if self.matches(layer, prefix, matcher):
+                    sections[section].append(layer)
+                    classified = True
+
+            # Add unclassified layers to "Tech Layer"
+            if not classified:
+                sections["Tech Layer"].append(layer)
+
+        for section_layers in sections.values():
+            section_layers.sort()
+        return sections
+
+
+class LayerClassificationCache(object):
+
+    """
+    LRU cache of the five-section classification of a node's layers.
+
+    Entries are keyed on (node name, channel list fingerprint, preferences version), so
+    navigating between sections of an unchanged input is a dictionary lookup. Passing a
+    different classifier (recompiled preferences) also starts a new preferences version.
+    """
+
+    def __init__(self, maxsize=16):
+        self.maxsize = maxsize
+        self.preferences_version = 0
+        self.classifier = None
+        self.entries = OrderedDict()
+
+    def get_sections(self, node, classifier):
+        """Return the section -> sorted layers map of the node, classifying it on a miss."""
+        if classifier is not self.classifier:
+            self.invalidate()
+            self.classifier = classifier
+
+        layer_index = layerindex.get_layer_index(node)
+        key = (node.fullName(), layer_index.fingerprint, self.preferences_version)
+        sections = self.entries.get(key)
+        if sections is not None:
+            self.entries.move_to_end(key)
+            return sections
+
+        sections = classifier.classify(layer_index.layers)
+        self.entries[key] = sections
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        return sections
+
+    def invalidate(self):
+        """Drop every entry, called when the preferences are saved."""
+        self.preferences_version += 1
+        self.entries.clear()
+
+
+classification_cache = LayerClassificationCache()
+
+
+def classify_channels(channels, classifier):
+    """Return the section -> sorted layers map of a raw channel list."""
+    return classifier.classify(layerindex.build_layer_index(channels))
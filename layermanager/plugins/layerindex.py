@@ -0,0 +1,87 @@
+#------------------------------------------------------------------------------#
+#-------------------------------------------------------------------- HEADER --#
+
+"""
+:synopsis:
+    Shared layer index of a node's channels.
+
+    Turns a channel list ("layer.channel" names) into an ordered, de-duplicated
+    layer -> channels mapping in a single pass. The index of a node is memoized
+    until its channel list changes, so the Layer Manager, the Shuffle2 mapping
+    and the contribution node all reuse the same per-layer channel lists.
+"""
+
+#------------------------------------------------------------------------------#
+#------------------------------------------------------------------- IMPORTS --#
+
+from collections import OrderedDict
+
+# ---------------------------------------------------------------------------- #
+# ----------------------------------------------------------------- GLOBALS -- #
+
+# Number of nodes whose layer index is kept in memory
+MAX_INDEXED_NODES = 32
+
+_node_indexes = OrderedDict()
+
+#------------------------------------------------------------------------------#
+#----------------------------------------------------------------- FUNCTIONS --#
+
+class LayerIndex(object):
+    """
+    Ordered layer -> channels mapping of a channel list.
+    """
+    __slots__ = ("fingerprint", "layers")
+
+    def __init__(self, channels, fingerprint=None):
+        channels = tuple(channels)
+        self.fingerprint = hash(channels) if fingerprint is None else fingerprint
+        self.layers = build_layer_index(channels)
+
+    def layer_names(self):
+        return list(self.layers)
+
+    def channels(self, layer):
+        """Return the channels of a layer, in the node's channel order."""
+        return self.layers.get(layer, [])
+
+
+def build_layer_index(channels):
+    """Map each layer to its channels in one pass, keeping the first-seen layer order."""
+    layers = {}
+    for channel in channels:
+        layer = channel.partition('.')[0]
+        layer_channels = layers.get(layer)
+        if layer_channels is None:
+            layers[layer] = [channel]
+        else:
+            layer_channels.append(channel)
+    return layers
+
+
+def get_layer_index(node):
+    """Return the memoized LayerIndex of a node, rebuilt only when its channels changed."""
+    channels = tuple(node.channels())
+    fingerprint = hash(channels)
+    node_name = node.fullName()
+
+    index = _node_indexes.get(node_name)
+    if index is not None and index.fingerprint == fingerprint:
+        _node_indexes.move_to_end(node_name)
+        return index
+
+    index = LayerIndex(channels, fingerprint)
+    _node_indexes[node_name] = index
+    _node_indexes.move_to_end(node_name)
+    if len(_node_indexes) > MAX_INDEXED_NODES:
+        _node_indexes.popitem(last=False)
+    return index
+
+
+def get_layers(node):
+    """Return the de-duplicated layer names of a node."""
+    return get_layer_index(node).layer_names()
+
+
+def clear():
+    _node_indexes.clear()
@@ -23,36 +23,219 @@ This tool provides a user-friendly interface for quickly visualizing Viewer Laye
 import nuke
 import os
 import json
-import math
 import shuffle
 import gradeaov
 import contribution
+import contactsheet
+import layerindex
+import layerpreferences
+import nodeplacement
+import shufflemapping
+from layerclassifier import SECTION_KEYS, classification_cache
 
 
-from PySide2.QtWidgets import QApplication, QWidget, QHBoxLayout, QListWidget, \
-    QListWidgetItem, QFrame, QDialog, QVBoxLayout, QLabel, QLineEdit, QPushButton, QMessageBox
+from PySide2.QtWidgets import QApplication, QWidget, QHBoxLayout, QListView, QAbstractItemView, \
+    QFrame, QDialog, QVBoxLayout, QLabel, QLineEdit, QPushButton, QMessageBox, QComboBox
 
-from PySide2.QtCore import Qt, Signal
-from PySide2.QtGui import QColor
+from PySide2.QtCore import Qt, Signal, QAbstractListModel, QModelIndex, QObject, QTimer
+from PySide2.QtGui import QColor, QFont
 
 
+# Defaults of the optional "Channel Switch Delay" (ms) and "Channel Switch Immediate" preferences
+CHANNEL_SWITCH_DELAY = 120
+CHANNEL_SWITCH_IMMEDIATE = True
 
-class LayerSelector(QListWidget):
+# Labels of the contact sheet modes, the optional "Contact Sheet Mode" preference sets the default one
+CONTACT_SHEET_MODE_LABELS = {
+    contactsheet.MODE_FULL: 'Full',
+    contactsheet.MODE_LIGHTWEIGHT: 'Lightweight',
+    contactsheet.MODE_SEQUENCE: 'Frame by Frame',
+}
 
+
+class ChannelSwitchScheduler(QObject):
+
+    """
+    Coalesce viewer channel requests during rapid arrow-key navigation.
+
+    Only the most recent requested channel is applied once the key repeat settles for
+    `delay` ms. With `immediate` the first press of a burst is applied right away. A
+    single apply is queued in the main thread at a time and it reads the latest request
+    when it runs, so a stale layer is never applied.
+    """
+
+    def __init__(self, apply_channel, delay=CHANNEL_SWITCH_DELAY, immediate=CHANNEL_SWITCH_IMMEDIATE, parent=None):
+        super(ChannelSwitchScheduler, self).__init__(parent)
+        self.apply_channel = apply_channel
+        self.immediate = immediate
+        self.pending_channel = None
+        self.is_queued = False
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay)
+        self.timer.timeout.connect(self.queue_pending)
+
+    def configure(self, delay=CHANNEL_SWITCH_DELAY, immediate=CHANNEL_SWITCH_IMMEDIATE):
+        self.timer.setInterval(delay)
+        self.immediate = immediate
+
+    def request(self, channel):
+        """Request a channel switch, restarting the debounce window."""
+        self.pending_channel = channel
+        if self.immediate and not self.timer.isActive():
+            self.queue_pending()
+        self.timer.start()
+
+    def cancel(self):
+        """Forget the pending request, used when a channel is set directly."""
+        self.timer.stop()
+        self.pending_channel = None
+
+    def queue_pending(self):
+        if self.is_queued or self.pending_channel is None:
+            return
+        self.is_queued = True
+        nuke.executeInMainThread(self.apply_pending)
+
+    def apply_pending(self):
+        self.is_queued = False
+        channel, self.pending_channel = self.pending_channel, None
+        if channel is not None:
+            self.apply_channel(channel)
+
+
+class LayerListModel(QAbstractListModel):
+
+    """
+    A list model holding the layer names of the current section.
+
+    Colours and the "added to GradeAOV" state are served through data() roles, so the
+    view only queries the rows it displays instead of restyling every item.
     """
-    A custom QListWidget for managing and interacting with layers.
+
+    AddedRole = Qt.UserRole + 1
+    EMPTY_LAYER_TEXT = "!!! Layer Empty !!!"
+
+    def __init__(self, parent=None):
+        super(LayerListModel, self).__init__(parent)
+        self.layers = []
+        self.added_layers = set()
+        # (node, section) the layers were listed for, the added layers only belong to it
+        self.source = None
+        self.is_placeholder = False
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.layers)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        layer = self.layers[index.row()]
+
+        if role == Qt.DisplayRole:
+            return layer
+        elif role == self.AddedRole:
+            return layer in self.added_layers
+        elif role == Qt.BackgroundRole and layer in self.added_layers:
+            return QColor('#01859F')
+        elif role == Qt.ForegroundRole and layer in self.added_layers:
+            return QColor('black')
+        elif self.is_placeholder and layer == self.EMPTY_LAYER_TEXT:
+            if role == Qt.TextAlignmentRole:
+                return Qt.AlignCenter
+            elif role == Qt.FontRole:
+                font = QFont()
+                font.setBold(True)
+                return font
+        return None
+
+    def layer(self, row):
+        """Return the layer name of a row, None when the row does not exist."""
+        if 0 <= row < len(self.layers):
+            return self.layers[row]
+        return None
+
+    def set_source(self, source):
+        """Forget the added layers when the list shows the layers of another node or section."""
+        if source == self.source:
+            return
+        self.source = source
+        if self.added_layers:
+            self.added_layers.clear()
+            if self.layers:
+                self.dataChanged.emit(self.index(0), self.index(len(self.layers) - 1),
+                                      [Qt.BackgroundRole, Qt.ForegroundRole, self.AddedRole])
+
+    def set_placeholder(self):
+        """Display the "Layer Empty" placeholder instead of the layers."""
+        if self.is_placeholder:
+            return
+        self.beginResetModel()
+        self.layers = [""] * 4 + [self.EMPTY_LAYER_TEXT]
+        self.is_placeholder = True
+        self.endResetModel()
+
+    def set_layers(self, layers):
+        """
+        Update the model to the given sorted layers through a diff.
+
+        Only the rows that changed are removed or inserted, so the view keeps its
+        selection and scroll position on the layers that stay in the list.
+        """
+        if self.is_placeholder:
+            self.beginResetModel()
+            self.layers = []
+            self.is_placeholder = False
+            self.endResetModel()
+
+        wanted_layers = set(layers)
+        for row in reversed(range(len(self.layers))):
+            if self.layers[row] not in wanted_layers:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self.layers[row]
+                self.endRemoveRows()
+
+        # The kept layers are already in sorted order, insert the new ones between them
+        for row, layer in enumerate(layers):
+            if row >= len(self.layers) or self.layers[row] != layer:
+                self.beginInsertRows(QModelIndex(), row, row)
+                self.layers.insert(row, layer)
+                self.endInsertRows()
+
+    def append_layer(self, layer):
+        row = len(self.layers)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.layers.append(layer)
+        self.endInsertRows()
+
+    def mark_added(self, layer):
+        """Flag a layer as added to a GradeAOV and repaint its row."""
+        self.added_layers.add(layer)
+        if layer in self.layers:
+            index = self.index(self.layers.index(layer))
+            self.dataChanged.emit(index, index, [Qt.BackgroundRole, Qt.ForegroundRole, self.AddedRole])
+
+
+class LayerSelector(QListView):
+
+    """
+    A custom QListView for managing and interacting with layers.
 
     Features:
     - Keyboard shortcuts for quick navigation and actions
     - Mouse interactions for selection and layer operations
     - Custom styles and dynamic updates
+    - Backed by a LayerListModel, only the visible rows are rendered
     """
 
     keyPressed = Signal(int)
-    ctrlClicked = Signal(QListWidgetItem)
-    shiftClicked = Signal(QListWidgetItem)
-    shiftCtrlClicked = Signal(QListWidgetItem)
-    altClicked = Signal(QListWidgetItem)
+    layerClicked = Signal(str)
+    ctrlClicked = Signal(str)
+    shiftClicked = Signal(str)
+    shiftCtrlClicked = Signal(str)
+    altClicked = Signal(str)
     ctrlPressed = Signal(bool)
     shiftPressed = Signal(bool)
     rowChanged = Signal(int)
@@ -61,6 +244,43 @@ class LayerSelector(QListWidget):
     def __init__(self, parent=None):
         super(LayerSelector, self).__init__(parent)
         self.setFocusPolicy(Qt.StrongFocus)
+        self.setUniformItemSizes(True)
+        self.layer_model = LayerListModel(self)
+        self.setModel(self.layer_model)
+        self.clicked.connect(self.handle_clicked)
+
+    def count(self):
+        return self.layer_model.rowCount()
+
+    def currentRow(self):
+        return self.currentIndex().row()
+
+    def setCurrentRow(self, row):
+        self.setCurrentIndex(self.layer_model.index(row))
+
+    def layer(self, row):
+        return self.layer_model.layer(row)
+
+    def currentLayer(self):
+        return self.layer_model.layer(self.currentRow())
+
+    def layers(self):
+        """Return the layer names of the list, without the empty placeholder."""
+        if self.layer_model.is_placeholder:
+            return []
+        return list(self.layer_model.layers)
+
+    def selectedLayers(self):
+        """Return the selected layer names, in list order."""
+        if self.layer_model.is_placeholder:
+            return []
+        rows = sorted(index.row() for index in self.selectedIndexes())
+        return [layer for layer in (self.layer_model.layer(row) for row in rows) if layer]
+
+    def handle_clicked(self, index):
+        layer = self.layer_model.layer(index.row())
+        if layer:
+            self.layerClicked.emit(layer)
 
     def keyPressEvent(self, event):
         current_row = self.currentRow()
@@ -93,29 +313,33 @@ class LayerSelector(QListWidget):
     def mousePressEvent(self, event):
         if self.is_empty_layer_present:
             return
+        layer = self.layer_model.layer(self.indexAt(event.pos()).row())
+        # Shift extends and Ctrl toggles the selection, their actions only get the clicked layer
         super(LayerSelector, self).mousePressEvent(event)
-        item = self.itemAt(event.pos())
-        if item:
+        if layer:
             if event.button() == Qt.LeftButton and QApplication.keyboardModifiers() == Qt.ControlModifier:
-                self.ctrlClicked.emit(item)
+                self.ctrlClicked.emit(layer)
             elif event.button() == Qt.LeftButton and QApplication.keyboardModifiers() == Qt.ShiftModifier:
-                self.shiftClicked.emit(item)
+                self.shiftClicked.emit(layer)
             elif event.button() == Qt.LeftButton and QApplication.keyboardModifiers() == (Qt.ShiftModifier | Qt.ControlModifier):
-                self.shiftCtrlClicked.emit(item)
-
-
-    def setStyleSheet(self, styleSheet):
-        for index in range(self.count()):
-            item = self.item(index)
-            item.setBackground(QColor('orange'))
-            item.setForeground(QColor('black'))
-        super(LayerSelector, self).setStyleSheet(styleSheet)
+                self.shiftCtrlClicked.emit(layer)
 
     def add_layer_to_list(self, layer_name, custom):
         if not custom:
-            layer_name = "!!! Layer Empty !!!"
-        item = QListWidgetItem(layer_name)
-        self.addItem(item)
+            layer_name = LayerListModel.EMPTY_LAYER_TEXT
+        self.layer_model.append_layer(layer_name)
+
+    def set_layers(self, layers):
+        self.layer_model.set_layers(layers)
+
+    def set_placeholder(self):
+        self.layer_model.set_placeholder()
+
+    def set_source(self, source):
+        self.layer_model.set_source(source)
+
+    def mark_added(self, layer):
+        self.layer_model.mark_added(layer)
 
 
 class PreferencesDialog(QDialog):
@@ -136,9 +360,12 @@ class PreferencesDialog(QDialog):
     1. Layer Layer: Configure keywords for each Layer category
     2. General Settings: Define exclusion keywords
 
-    The preferences are saved in a JSON file and reloaded when the dialog is reopened.
+    The preferences are validated and saved atomically in a JSON file, then pushed with
+    their compiled classifier through preferencesSaved, without reading the file back.
     """
 
+    preferencesSaved = Signal(object, object)
+
     def __init__(self, parent=None):
         super(PreferencesDialog, self).__init__(parent)
         self.setWindowTitle("Preferences")
@@ -156,7 +383,7 @@ class PreferencesDialog(QDialog):
             "custom Title": ""
         }
         self.text_fields = {}
-        self.filepath = os.path.join(os.path.expanduser("~"), ".nuke", "layermanager_preferences.json")
+        self.filepath = layerpreferences.layermanager_preferences.filepath
         self.load_preferences()
 
 
@@ -301,54 +528,32 @@ class PreferencesDialog(QDialog):
         layout.addWidget(spacer)
 
     def load_preferences(self):
-        """Load preferences from a JSON file."""
-        if os.path.exists(self.filepath):
-            try:
-                with open(self.filepath, 'r') as file:
-                    self.preferences = json.load(file)
-
-
-            except Exception as e:
-                QMessageBox.warning(self, "Error", f"Failed to load preferences: {e}")
-        else:
-            # Initialize with default values if the file does not exist
-            self.preferences = {
-                "Exclusion Keywords": [],
-                "Garde AOV Node": "",
-                "Light Layer": [],
-                "Mask Layer": [],
-                "Tech Layer": [],
-                "Utility Layer": [],
-                "custom Layer": [],
-                "custom Title": "custom"
-            }
-
-        # Check that "Custom Title" is defined and not empty
-        if not self.preferences.get("custom Title"):
-            self.preferences["custom Title"] = "custom"
+        """Load preferences through the shared preferences service."""
+        self.preferences = layerpreferences.layermanager_preferences.load()
+        if layerpreferences.layermanager_preferences.error:
+            QMessageBox.warning(self, "Error",
+                                f"Failed to load preferences: {layerpreferences.layermanager_preferences.error}")
 
     def save_preferences(self):
-        """Save preferences to a JSON file and reload preferences."""
+        """Validate and atomically save the preferences, then push them to the Layer Manager."""
+        preferences = dict(self.preferences)
+        for section, text_field in self.text_fields.items():
+            if section == "custom Title":
+                preferences[section] = text_field.text().strip() or "custom"
+            else:
+                # Save other preferences in the form of a list, the schema drops blank keywords
+                preferences[section] = text_field.text().split(",")
+
         try:
-            with open(self.filepath, 'w') as file:
-                for section, text_field in self.text_fields.items():
-                    if section == "custom Title":
-                        self.preferences[section] = text_field.text().strip() or "custom"
-
-                    else:
-                            # Save other preferences in the form of a list
-                            self.preferences[section] = [kw.strip() for kw in text_field.text().split(",")]
-
-                # Save preferences in the JSON file
-                json.dump(self.preferences, file, indent=4)
-
-            # Reload preferences after backup
-            self.load_preferences()
-            print("Preferences saved successfully.")
-            nuke.message("Preferences saved successfully.")
-            self.close()
+            self.preferences = layerpreferences.layermanager_preferences.save(preferences)
         except Exception as e:
             QMessageBox.warning(self, "Error", f"Failed to save preferences: {e}")
+            return
+
+        classification_cache.invalidate()
+        self.preferencesSaved.emit(self.preferences, layerpreferences.layermanager_preferences.get_classifier())
+        print("Preferences saved successfully.")
+        self.close()
 
 
 class LayerManagerUI(QWidget):
@@ -394,6 +599,12 @@ class LayerManagerUI(QWidget):
         self.has_custom_layers = False
         self.channelChanged.connect(self.set_channel)
         self.section_keywords = load_section_keywords()
+        self.classifier = layerpreferences.layermanager_preferences.get_classifier()
+        self.channel_scheduler = ChannelSwitchScheduler(
+            self.set_channel,
+            delay=self.section_keywords.get("Channel Switch Delay", CHANNEL_SWITCH_DELAY),
+            immediate=self.section_keywords.get("Channel Switch Immediate", CHANNEL_SWITCH_IMMEDIATE),
+            parent=self)
         self.mode = 'Lead'
         self.initUI()
         self.channel_list_widget.rowChanged.connect(self.update_viewer_channel)
@@ -416,10 +627,11 @@ class LayerManagerUI(QWidget):
         self.layout.addWidget(self.select_channel_label)
         self.channel_list_widget = LayerSelector()
         self.channel_list_widget.setStyleSheet(
-            "QListWidget::item { color: #c0c0c0; }"
-            "QListWidget::item:selected { background: orange; color: black; }")
-        self.channel_list_widget.setSelectionMode(QListWidget.SingleSelection)
-        self.channel_list_widget.itemClicked.connect(self.itemClicked)
+            "QListView::item { color: #c0c0c0; }"
+            "QListView::item:selected { background: orange; color: black; }")
+        # Several layers can be selected for a single GradeAOV or a section shuffle out
+        self.channel_list_widget.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.channel_list_widget.layerClicked.connect(self.itemClicked)
         self.channel_list_widget.setToolTip('List of available layers')
         self.layout.addWidget(self.channel_list_widget)
         self.action_buttons_layout = QHBoxLayout()
@@ -438,6 +650,11 @@ class LayerManagerUI(QWidget):
             self.layout.addLayout(self.action_buttons_layout)
         else:
             self.layout.addWidget(self.action_button)
+        self.shuffle_section_button = QPushButton('Shuffle Out Section')
+        self.shuffle_section_button.clicked.connect(self.create_section_shuffles)
+        self.shuffle_section_button.setToolTip('Create a Shuffle2 for every layer of the current section,\n'
+                                               'in a single undo step')
+        self.layout.addWidget(self.shuffle_section_button)
         self.line2 = QFrame()
         self.line2.setFrameShape(QFrame.HLine)
         self.line2.setFrameShadow(QFrame.Sunken)
@@ -465,10 +682,21 @@ class LayerManagerUI(QWidget):
         self.line3.setFrameShadow(QFrame.Sunken)
         self.line3.setToolTip('Third separator line')
         self.layout.addWidget(self.line3)
+        self.contact_sheet_layout = QHBoxLayout()
         self.contact_sheet_button = QPushButton('Create Contact Sheet')
         self.contact_sheet_button.clicked.connect(self.create_layer_contact_sheet)
         self.contact_sheet_button.setToolTip('Create a LayerContactSheet for the current section layers')
-        self.layout.addWidget(self.contact_sheet_button)
+        self.contact_sheet_mode_combo = QComboBox()
+        for mode in contactsheet.CONTACT_SHEET_MODES:
+            self.contact_sheet_mode_combo.addItem(CONTACT_SHEET_MODE_LABELS[mode], mode)
+        self.contact_sheet_mode_combo.setToolTip(
+            'Full: layers at plate resolution\n'
+            'Lightweight: layers downscaled to proxy tiles\n'
+            'Frame by Frame: one proxy layer per frame')
+        self.set_contact_sheet_mode(self.section_keywords.get("Contact Sheet Mode", contactsheet.MODE_FULL))
+        self.contact_sheet_layout.addWidget(self.contact_sheet_button)
+        self.contact_sheet_layout.addWidget(self.contact_sheet_mode_combo)
+        self.layout.addLayout(self.contact_sheet_layout)
         preferences_button = QPushButton("Preferences")
         preferences_button.clicked.connect(self.open_preferences)
         self.layout.addWidget(preferences_button)
@@ -494,31 +722,30 @@ class LayerManagerUI(QWidget):
         x = (screen_geometry.width() - self.width()) // 2
         y = (screen_geometry.height() - self.height()) // 2
         self.move(x, y)
-        self.channels()
         self.update_section_label()
         self.show()
 
     def open_preferences(self):
         dialog = PreferencesDialog(self)
+        dialog.preferencesSaved.connect(self.apply_preferences)
         dialog.exec_()
-        self.section_keywords = dialog.preferences
+
+    def apply_preferences(self, preferences, classifier):
+        """Use the preferences and classifier pushed by the dialog, without reloading them from disk."""
+        self.section_keywords = preferences
+        self.classifier = classifier
+        self.channel_scheduler.configure(
+            delay=preferences.get("Channel Switch Delay", CHANNEL_SWITCH_DELAY),
+            immediate=preferences.get("Channel Switch Immediate", CHANNEL_SWITCH_IMMEDIATE))
+        self.set_contact_sheet_mode(preferences.get("Contact Sheet Mode", contactsheet.MODE_FULL))
         self.update_section_label()
 
+    def set_contact_sheet_mode(self, mode):
+        index = self.contact_sheet_mode_combo.findData(mode)
+        self.contact_sheet_mode_combo.setCurrentIndex(max(index, 0))
+
     def load_section_keywords(self):
-        filepath = os.path.join(os.path.expanduser("~"), ".nuke", "layermanager_preferences.json")
-        if os.path.exists(filepath):
-            try:
-                with open(filepath, 'r') as file:
-                    return json.load(file)
-            except Exception as e:
-                print(f"Failed to load section keywords: {e}")
-        return {
-            "Light Layer": [],
-            "Mask Layer": [],
-            "Tech Layer": [],
-            "Utility Layer": [],
-            "custom Title": []
-        }
+        return load_section_keywords()
 
     def get_current_user_name(self):
         return os.getenv('USER') or os.getenv('USERNAME') or 'unknown_user'
@@ -533,7 +760,7 @@ class LayerManagerUI(QWidget):
             self.last_light_layer = None
         print(f"Layer selection updated: {self.last_selected_layer}, Parent RGBA Layer: {self.last_light_layer}")
 
-    def create_Shuffle(self, item):
+    def create_Shuffle(self, layer):
         try:
             group = nuke.thisGroup()
             if group is None:
@@ -565,8 +792,8 @@ class LayerManagerUI(QWidget):
 
                 # Configure the properties of the shuffle
                 shuffle_node['in'].setValue('none')
-                shuffle_node['in'].setValue(item.text())
-                shuffle_node['label'].setValue(item.text())
+                shuffle_node['in'].setValue(layer)
+                shuffle_node['label'].setValue(layer)
                 shuffle_node['in2'].setValue('rgba')
 
                 print(f"Shuffle node created next to node: {last_selected_node.name()}")
@@ -575,7 +802,7 @@ class LayerManagerUI(QWidget):
             nuke.message(f"Error creating Shuffle node: {str(e)}")
             print(f"Error creating Shuffle node: {str(e)}")
 
-    def create_Shuffle2(self, item):
+    def create_Shuffle2(self, layer):
         try:
             group = nuke.thisGroup()
             if group is None:
@@ -596,69 +823,23 @@ class LayerManagerUI(QWidget):
                         print("No relevant node found to place the Shuffle2 node next to.")
                         return
 
-                    # Create a Shuffle 2 knot
-                    shuffle2_node = nuke.createNode('Shuffle2')
-
-                    # Obtain the visible central position of the Node Graph
-                    current_center = nuke.center()
-                    zoom_level = nuke.zoom()
-
-                    # Adjust the coordinates so that they relate to the visible view
-                    center_x = int(current_center[0])
-                    center_y = int(current_center[1])
-
-                    # Position the node in the visible center of the Node Graph
-                    shuffle2_node.setXpos(center_x - shuffle2_node.screenWidth() // 2)
-                    shuffle2_node.setYpos(center_y - shuffle2_node.screenHeight() // 2)
-
-                    shuffle2_node['in1'].setValue(item.text())
-                    shuffle2_node['label'].setValue(item.text())
-
-                    # Get the channels available for this layer
-                    all_channels = nuke.channels()
-                    available_channels = [ch for ch in all_channels if ch.startswith(item.text())]
-
-                    # Configure mappings according to the available channels
-                    mappings = []
-                    if item.text() == 'motion':
-                        mappings = [(0, 'forward.u', 'rgba.red'), (0, 'forward.v', 'rgba.green'),
-                                    (0, 'backward.u', 'rgba.blue'), (0, 'backward.v', 'rgba.alpha')]
-                    elif item.text() == 'N':
-                        mappings = [(0, 'N.X', 'rgba.red'), (0, 'N.Y', 'rgba.green'), (0, 'N.Z', 'rgba.blue'),
-                                    (-1, 'black', 'rgba.alpha')]
-                    elif item.text() == 'N_filter':
-                        mappings = [(0, 'N_filter.X', 'rgba.red'), (0, 'N_filter.Y', 'rgba.green'),
-                                    (0, 'N_filter.Z', 'rgba.blue'),
-                                    (-1, 'black', 'rgba.alpha')]
-                    elif item.text() == 'P':
-                        mappings = [(0, 'P.X', 'rgba.red'), (0, 'P.Y', 'rgba.green'), (0, 'P.Z', 'rgba.blue'),
-                                    (-1, 'black', 'rgba.alpha')]
-                    elif item.text() == 'P_filter':
-                        mappings = [(0, 'P_filter.X', 'rgba.red'), (0, 'P_filter.Y', 'rgba.green'),
-                                    (0, 'P_filter.Z', 'rgba.blue'),
-                                    (-1, 'black', 'rgba.alpha')]
-                    elif item.text() == 'depth':
-                        mappings = [(0, 'depth/home/dfrancois/private/.nuke/gizmos/gradeaov_ref.gizmo.Z', 'rgba.red'), (-1, 'black', 'rgba.green'), (-1, 'black', 'rgba.blue'),
-                                    (-1, 'black', 'rgba.alpha')]
-                    elif item.text() == 'rfx_depth':
-                        mappings = [(0, 'rfx_depth.Z', 'rgba.red'), (-1, 'black', 'rgba.green'),
-                                    (-1, 'black', 'rgba.blue'),
-                                    (-1, 'black', 'rgba.alpha')]
-                    elif item.text() == 'other':
-                        mappings = [(0, 'other.caustic', 'rgba.red'), (-1, 'other.glint', 'rgba.green'),
-                                    (-1, 'other.rfx_depth', 'rgba.blue'),
-                                    (-1, 'black', 'rgba.alpha')]
-                    else:
-                        # For other layers, map the RGBA channels generic
-                        channel_map = {'red': 'red', 'green': 'green', 'blue': 'blue', 'alpha': 'alpha'}
-                        for channel in ['red', 'green', 'blue', 'alpha']:
-                            input_channel = f'{item.text()}.{channel}'
-                            if input_channel in available_channels:
-                                output_channel = f'rgba.{channel_map[channel]}'
-                                mappings.append((0, input_channel, output_channel))
-
-                        # Redirect the alpha channel to red
-                        mappings.append((0, f'{item.text()}.red', 'rgba.alpha'))
+                    # Index the node positions before the new node shows up
+                    placement_index = nodeplacement.get_placement_index()
+
+                    # Create a Shuffle 2 knot, without autoplace, in the nearest free slot under the node
+                    shuffle2_node = nuke.nodes.Shuffle2(inputs=[last_selected_node])
+                    nodeplacement.place_under(shuffle2_node, last_selected_node, placement_index)
+                    for node in nuke.selectedNodes():
+                        node['selected'].setValue(False)
+                    shuffle2_node['selected'].setValue(True)
+
+                    shuffle2_node['in1'].setValue(layer)
+                    shuffle2_node['label'].setValue(layer)
+
+                    # Resolve the mapping rules against the channels of the input layers only
+                    mappings = shufflemapping.resolve_mappings(
+                        layer, layerindex.get_layer_index(last_selected_node),
+                        shufflemapping.get_mapping_table(self.section_keywords.get("Shuffle2 Mappings")))
 
                     if mappings:
                         shuffle2_node['mappings'].setValue(mappings)
@@ -669,7 +850,43 @@ class LayerManagerUI(QWidget):
             nuke.message(f"Error creating Shuffle2 node: {str(e)}")
             print(f"Error creating Shuffle2 node: {str(e)}")
 
-    def create_gradeaov(self, item):
+    def create_section_shuffles(self):
+        """Shuffle out the selected layers, or every layer of the current section, in one operation."""
+        try:
+            layers = self.channel_list_widget.selectedLayers()
+            if len(layers) < 2:
+                layers = self.channel_list_widget.layers()
+            if not layers:
+                nuke.message('No layers to shuffle out in this section.')
+                return
+
+            group = nuke.thisGroup() or nuke.root()
+            with group:
+                source_node = None
+                viewer = nuke.activeViewer()
+                if viewer and viewer.activeInput() is not None:
+                    source_node = viewer.node().input(viewer.activeInput())
+                if source_node is None:
+                    nuke.message("No relevant node found to place the Shuffle2 nodes next to.")
+                    return
+
+                nodes = shuffle.shuffle_out_layers(
+                    source_node, layers, layerindex.get_layer_index(source_node),
+                    shufflemapping.get_mapping_table(self.section_keywords.get("Shuffle2 Mappings")))
+                print(f"{len(nodes)} Shuffle2 nodes created under node: {source_node.name()}")
+
+        except Exception as e:
+            nuke.message(f"Error creating Shuffle2 nodes: {str(e)}")
+            print(f"Error creating Shuffle2 nodes: {str(e)}")
+
+    def get_light_layers(self, layer):
+        """Return the selected layers when layer is part of a multiple selection, else only layer."""
+        layers = self.channel_list_widget.selectedLayers()
+        if len(layers) > 1 and layer in layers:
+            return layers
+        return [layer]
+
+    def create_gradeaov(self, layer, layers=None):
         try:
             # Put the channels on RGBA in the active viewer
             viewer = nuke.activeViewer()
@@ -702,6 +919,9 @@ class LayerManagerUI(QWidget):
                     nuke.message("Aucune sélection valide trouvée. Sélectionne un nœud avant d'ajouter un GradeAOV.")
                     return
 
+                # Index the node positions before the new node shows up
+                placement_index = nodeplacement.get_placement_index()
+
                 # Create the node `GradeAOV`
                 node = nuke.createNode('gradeaov', inpanel=False)
 
@@ -712,16 +932,14 @@ class LayerManagerUI(QWidget):
 
                 # ✅ Add a verification before defining the node position
                 try:
-                    node.setXpos(
-                        int(last_selected_node.xpos() + last_selected_node.screenWidth() / 2 - node.screenWidth() / 2))
-                    node.setYpos(int(last_selected_node.ypos() + 70))
+                    nodeplacement.place_under(node, last_selected_node, placement_index)
                 except Exception as e:
                     print(f"Erreur lors du positionnement du GradeAOV : {e}")
                     nuke.message(f"Erreur lors du positionnement du GradeAOV : {e}")
 
-                # Configure the Knobs
-                node["layers_options_add_layer_pyscript"].execute()
-                node["layer_0_link"].setValue(item.text())
+                # Configure the Knobs, with every given light in one pass
+                layers = layers or [layer]
+                gradeaov.add_layers(node, layers)
 
                 # ✅ Open the properties window and display the Settings tab if possible
                 try:
@@ -734,19 +952,19 @@ class LayerManagerUI(QWidget):
                 except Exception as e:
                     print(f"Erreur lors de l'affichage du nœud : {e}")
 
-                print(f"GradeAOV node created with layer '{item.text()}'.")
+                print(f"GradeAOV node created with layers: {', '.join(layers)}.")
 
         except Exception as e:
             nuke.message(f"Error creating GradeAOV node: {str(e)}")
             print(f"Error creating GradeAOV node: {str(e)}")
 
-    def create_contribution(self, item=None):
+    def create_contribution(self, layer=None):
         try:
             # Display the memory buffer for debugging
             print(f"Using memory: Last selected layer is '{self.last_selected_layer}'")
 
-            # Use the item if provided, otherwise fall back to the memory buffer
-            contribution_layer = item.text() if item else self.last_selected_layer
+            # Use the layer if provided, otherwise fall back to the memory buffer
+            contribution_layer = layer or self.last_selected_layer
             if not contribution_layer:
                 nuke.message("No valid layer selected or in memory!")
                 print("No valid layer selected or in memory!")
@@ -783,12 +1001,11 @@ class LayerManagerUI(QWidget):
                     return
 
                 # Create the Contribution node
+                placement_index = nodeplacement.get_placement_index()
                 cont_node = nuke.createNode('contribution', inpanel=False)
 
-                # Position the node
-                cont_node.setXpos(
-                    int(last_selected_node.xpos() + last_selected_node.screenWidth() / 2 - cont_node.screenWidth() / 2))
-                cont_node.setYpos(int(last_selected_node.ypos() + 70))
+                # Position the node in the nearest free slot under the source
+                nodeplacement.place_under(cont_node, last_selected_node, placement_index)
 
                 # Configure the knobs
                 cont_node['layer_layer_light_choice'].setValue(light_layer)
@@ -807,30 +1024,30 @@ class LayerManagerUI(QWidget):
             nuke.message(f"Error creating Contribution node: {str(e)}")
             print(f"Error creating Contribution node: {str(e)}")
 
-    def Ctrl_Click(self, item):
+    def Ctrl_Click(self, layer):
         if self.current_section in [0]:
-            self.create_gradeaov(item)
+            self.create_gradeaov(layer)
         elif self.current_section in [1, 2, 3]:
-            self.create_Shuffle2(item)
+            self.create_Shuffle2(layer)
         elif self.current_section in [4]:
-            self.create_contribution(item)
+            self.create_contribution(layer)
 
     def handle_action_button(self):
-        selected_item = self.channel_list_widget.currentItem()
-        if selected_item:
+        selected_layer = self.channel_list_widget.currentLayer()
+        if selected_layer:
             if self.current_section == 0:
-                self.create_gradeaov(selected_item)
+                self.create_gradeaov(selected_layer, self.get_light_layers(selected_layer))
             elif self.current_section in [1, 2, 3]:
-                self.create_Shuffle2(selected_item)
+                self.create_Shuffle2(selected_layer)
             elif self.current_section == 4:
-                self.create_contribution(selected_item)
+                self.create_contribution(selected_layer)
 
-    def handle_ctrl_click(self, item):
+    def handle_ctrl_click(self, layer):
         """Create a shuffle2 with Ctrl + Click on a Channel Layer."""
-        print(f"Ctrl + Click detected on layer: {item.text()}")
-        self.create_Shuffle2(item)
+        print(f"Ctrl + Click detected on layer: {layer}")
+        self.create_Shuffle2(layer)
 
-    def handle_shift_click(self, item):
+    def handle_shift_click(self, layer):
         """
         Action activated by Shift+Click.
         - Section 0 : Create GradeAOV.
@@ -838,42 +1055,42 @@ class LayerManagerUI(QWidget):
         """
         try:
             if self.current_section == 0:
-                print(f"Shift+Click detected in Light Layer on layer: {item.text()}")
-                self.create_gradeaov(item)
+                print(f"Shift+Click detected in Light Layer on layer: {layer}")
+                self.create_gradeaov(layer)
             elif self.current_section == 4:
-                print(f"Shift+Click detected in custom Layer on layer: {item.text()}")
-                self.create_contribution(item)
+                print(f"Shift+Click detected in custom Layer on layer: {layer}")
+                self.create_contribution(layer)
             else:
                 print("Shift+Click is only enabled in Light Layer (Section 0) and custom Layer (Section 4).")
         except Exception as e:
             nuke.message(f"Error handling Shift+Click: {str(e)}")
             print(f"Error handling Shift+Click: {str(e)}")
 
-    def handle_shift_ctrl_click(self, item):
+    def handle_shift_ctrl_click(self, layer):
         """Action activated by Shift+Ctrl+Click to add a layer to the selected GradeAOV."""
         if self.current_section == 0:
-            print(f"Shift+Ctrl+Click detected on layer: {item.text()}")
-            self.add_layer_to_gradeaov(item)
+            print(f"Shift+Ctrl+Click detected on layer: {layer}")
+            self.add_layer_to_gradeaov(layer)
         else:
             print("Shift+Ctrl+Click is only enabled in Light Layer (Section 0).")
 
     def handle_keypress(self, key):
         print(f"LayerManagerUI received key: {key}")
-        selected_item = self.channel_list_widget.currentItem()
+        selected_layer = self.channel_list_widget.currentLayer()
 
         if key == Qt.Key_G:
             if self.current_section == 0:
                 print("Shortcut: G - Create Grade AOV")
-                if selected_item:
-                    self.create_gradeaov(selected_item)
+                if selected_layer:
+                    self.create_gradeaov(selected_layer, self.get_light_layers(selected_layer))
             elif self.current_section in [1, 2, 3]:
                 print("Shortcut: G - Create Shuffle2")
-                if selected_item:
-                    self.create_Shuffle2(selected_item)
+                if selected_layer:
+                    self.create_Shuffle2(selected_layer)
             elif self.current_section == 4:
                 print("Shortcut: G - Create contribution")
-                if selected_item:
-                    self.create_contribution(selected_item)
+                if selected_layer:
+                    self.create_contribution(selected_layer)
 
     def handle_add_layer_button(self):
         if self.current_section in [1, 2, 3]:
@@ -882,8 +1099,8 @@ class LayerManagerUI(QWidget):
         else:
             self.add_layer_button.setEnabled(True)
 
-        selected_item = self.channel_list_widget.currentItem()
-        if selected_item:
+        selected_layer = self.channel_list_widget.currentLayer()
+        if selected_layer:
             # Check and recover the Gradeaov node currently selected
             gradeaov_node = None
             for node in nuke.selectedNodes():
@@ -895,38 +1112,24 @@ class LayerManagerUI(QWidget):
                 nuke.message('No GradeAOV node selected.')
                 return
 
-            # Add a layer using the python script defined in the node
-            gradeaov_node["layers_options_add_layer_pyscript"].execute()
-
-            # Recover the layers counter and adjust the index for the new layer
-            layer_count = int(gradeaov_node["layer_count"].value()) - 1
-            knob_name = "layer_{}_link".format(layer_count)
+            # Add the selected layers in the free slots of the node
+            layers = self.get_light_layers(selected_layer)
+            slots = gradeaov.add_layers(gradeaov_node, layers)
 
-            # Update the value of the Knob with the name of the selected layer
-            gradeaov_node[knob_name].setValue(selected_item.text())
-
-            # Update the appearance of the elements of the list
-            self.channel_list_widget.setStyleSheet(
-                "QListWidget::item { color: #c0c0c0; }"
-                "QListWidget::item:selected { background: orange; color: black; }"
-            )
-            selected_item.setBackground(QColor('#01859F'))
-            selected_item.setForeground(QColor('black'))
-
-            for i in range(self.channel_list_widget.count()):
-                self.channel_list_widget.item(i).setBackground(QColor('transparent'))
-                self.channel_list_widget.item(i).setForeground(QColor('black'))
+            # Update the appearance of the added layers through the model
+            for added_layer in layers[:len(slots)]:
+                self.channel_list_widget.mark_added(added_layer)
 
     def handle_action_button(self):
-        selected_item = self.channel_list_widget.currentItem()
-        print(f"Action button clicked. Selected section: {self.current_section}, Selected item: {selected_item}")
-        if selected_item:
+        selected_layer = self.channel_list_widget.currentLayer()
+        print(f"Action button clicked. Selected section: {self.current_section}, Selected layer: {selected_layer}")
+        if selected_layer:
             if self.current_section == 0:
-                self.create_gradeaov(selected_item)
+                self.create_gradeaov(selected_layer, self.get_light_layers(selected_layer))
             elif self.current_section in [1, 2, 3]:
-                self.create_Shuffle2(selected_item)
+                self.create_Shuffle2(selected_layer)
             elif self.current_section == 4:
-                self.create_contribution(selected_item)
+                self.create_contribution(selected_layer)
 
     def create_layer_contact_sheet(self):
         try:
@@ -935,14 +1138,9 @@ class LayerManagerUI(QWidget):
                 group = nuke.root()
 
             with group:
-                layers = []
+                layers = [layer for layer in self.channel_list_widget.layers() if layer]
                 section_name = self.getSectionText()
 
-                for index in range(self.channel_list_widget.count()):
-                    item = self.channel_list_widget.item(index)
-                    if item and item.text() and item.text() != "!!! Layer Empty !!!":
-                        layers.append(item.text())
-
                 if not layers:
                     nuke.message('No valid layers found to create LayerContactSheet.')
                     return
@@ -954,100 +1152,10 @@ class LayerManagerUI(QWidget):
                     return
                 last_selected_node = selected_nodes[-1]
 
-                # Create a group to encapsulate all nodes
-                group_name = "{} ContactSheet".format(section_name)
-                group_node = nuke.createNode('Group', inpanel=False)
-                group_node.setName(group_name)
-                group_node['tile_color'].setValue(4278190335)
-
-               # Enter the group to create the nodes inside
-                group_node.begin()
-
-                # Create the Input node
-                input_node = nuke.createNode('Input', inpanel=False)
-                input_dot = nuke.createNode('Dot', inpanel=False)
-                input_dot.setInput(0, input_node)
-                input_dot.setYpos(input_dot.ypos() - 50)
-
-                shuffle_nodes = []
-                text_nodes = []
-                crop_nodes = []
-                grid_nodes = []
-
-                xpos_start = input_dot.xpos() - (
-                        80 * len(layers) // 2)
-
-                for i, layer in enumerate(layers):
-                    shuffle_node = nuke.createNode('Shuffle', inpanel=False)
-                    shuffle_node['in'].setValue(layer)
-                    shuffle_node['label'].setValue(layer)
-                    shuffle_node.setInput(0, input_dot)
-
-                    xpos = xpos_start + (i * 80)
-                    shuffle_node.setXpos(xpos)
-                    shuffle_node.setYpos(input_dot.ypos() + 100)
-                    shuffle_nodes.append(shuffle_node)
-
-                    crop_node = nuke.createNode('Crop', inpanel=False)
-                    crop_node['box'].setValue(
-                        [-14, -70, 2012, 1090])
-                    crop_node['reformat'].setValue(True)
-                    crop_node.setInput(0, shuffle_node)
-
-                    crop_node.setXpos(xpos)
-                    crop_node.setYpos(shuffle_node.ypos() + 50)
-                    crop_nodes.append(crop_node)
-
-                    grid_node = nuke.createNode('Grid', inpanel=False)
-                    grid_node['number'].setValue(1)
-                    grid_node['size'].setValue(4)
-                    grid_node.setInput(0, crop_node)
-
-                    grid_node.setXpos(xpos)
-                    grid_node.setYpos(crop_node.ypos() + 100)
-                    grid_nodes.append(grid_node)
-
-                    text_node = nuke.createNode('Text', inpanel=False)
-                    text_node['message'].setValue(layer)
-                    text_node['box'].setValue([0, 0, 1998, 1080])
-                    text_node['xjustify'].setValue('center')
-                    text_node['yjustify'].setValue('bottom')
-                    text_node.setInput(0, grid_node)
-
-                    text_node.setXpos(xpos)
-                    text_node.setYpos(grid_node.ypos() + 100)
-                    text_nodes.append(text_node)
-
-               # Calculate the values of Rows and Columns
-                num_layers = len(layers)
-                rows = int(math.floor(math.sqrt(num_layers)))
-                columns = int(math.ceil(num_layers / rows))
-
-                contact_sheet_node = nuke.createNode('ContactSheet', inpanel=False)
-                contact_sheet_node['width'].setValue(1998)
-                contact_sheet_node['height'].setValue(1080)
-                contact_sheet_node['rows'].setValue(rows)
-                contact_sheet_node['columns'].setValue(columns)
-                contact_sheet_node['center'].setValue(True)
-                contact_sheet_node['roworder'].setValue('TopBottom')
-                contact_sheet_node['gap'].setValue(8)
-
-                for i, text_node in enumerate(text_nodes):
-                    contact_sheet_node.setInput(i, text_node)
-
-                contact_sheet_node.setXpos(input_dot.xpos())
-                contact_sheet_node.setYpos(
-                    text_nodes[0].ypos() + 200)
-
-                # Create the output node and connect it to the contactsheet
-                output_node = nuke.createNode('Output', inpanel=False)
-                output_node.setInput(0, contact_sheet_node)
-
-                # Exit the group
-                group_node.end()
-
-                # Connect the output of the last selection to the input node of the group
-                group_node.setInput(0, last_selected_node)
+                # Build the whole group as one node script and paste it in a single operation
+                group_node = contactsheet.create_contact_sheet(
+                    last_selected_node, layers, section_name, self.contact_sheet_mode_combo.currentData(),
+                    self.section_keywords)
 
                 # Select and activate the Viewer
                 viewer_nodes = nuke.allNodes('Viewer')
@@ -1064,7 +1172,7 @@ class LayerManagerUI(QWidget):
             nuke.message(f"Error creating LayerContactSheet: {str(e)}")
             print(f"Error creating LayerContactSheet: {str(e)}")
 
-    def add_layer_to_gradeaov(self, item):
+    def add_layer_to_gradeaov(self, layer):
         """Centralized logic to add a layer to the selected GradeAOV."""
          # Verify and recover the currently selected GradeAOV node
         gradeaov_node = None
@@ -1079,32 +1187,22 @@ class LayerManagerUI(QWidget):
             return
 
         try:
-            # Add a layer using the Python script defined in the node
-            gradeaov_node["layers_options_add_layer_pyscript"].execute()
-
-            # Retrieve the layer counter and adjust the index for the new layer
-            layer_count = int(gradeaov_node["layer_count"].value()) - 1
-            knob_name = f"layer_{layer_count}_link"
-
-            # Update the knob value with the name of the selected layer
-            gradeaov_node[knob_name].setValue(item.text())
+            # Add the clicked layer in the first free slot of the node
+            layers = [layer]
+            slots = gradeaov.add_layers(gradeaov_node, layers)
 
-            # Update the colors to indicate that the layer has been added
-            item.setBackground(QColor('#01859F'))
-            item.setForeground(QColor('black'))
+            # Update the colors to indicate that the layers have been added
+            for added_layer in layers[:len(slots)]:
+                self.channel_list_widget.mark_added(added_layer)
 
-            print(f"Layer '{item.text()}' added to GradeAOV.")
+            print(f"Layers added to GradeAOV: {', '.join(layers[:len(slots)])}.")
         except Exception as e:
             nuke.message(f"Error adding layer to GradeAOV: {str(e)}")
             print(f"Error adding layer to GradeAOV: {str(e)}")
 
     def get_selected_channel(self):
         """Retrieves the layer currently selected from the list."""
-        selected_item = self.channel_list_widget.currentItem()
-        if selected_item:
-            return selected_item.text()
-        else:
-            return None
+        return self.channel_list_widget.currentLayer()
 
     def update_section_label(self):
         try:
@@ -1181,107 +1279,25 @@ class LayerManagerUI(QWidget):
         self.channels()
 
 
-    def channels(self):
-        self.channel_list_widget.clear()
+    def get_sections(self):
+        """Return the section -> sorted layers map of the active viewer input."""
         self.active_viewer = nuke.activeViewer().node()
-        viewer = self.active_viewer.input(nuke.activeViewer().activeInput())
-        all_layers = list(set([layer.split('.')[0] for layer in viewer.channels()]))
-
-        filtered_layers = self.get_filtered_layers(all_layers)
-        if not filtered_layers:
-            filtered_layers = []
-
-        filtered_layers.sort()
-
-
+        self.viewed_node = self.active_viewer.input(nuke.activeViewer().activeInput())
+        return classification_cache.get_sections(self.viewed_node, self.classifier)
 
-        for layer in filtered_layers:
-            item = QListWidgetItem(layer)
-            self.channel_list_widget.addItem(item)
-
-        if not filtered_layers:
-            for _ in range(4):
-                empty_item = QListWidgetItem("")
-                self.channel_list_widget.addItem(empty_item)
-
-            empty_item = QListWidgetItem("!!! Layer Empty !!!")
-            empty_item.setTextAlignment(Qt.AlignCenter)
-            font = empty_item.font()
-            font.setBold(True)
-            empty_item.setFont(font)
-            self.channel_list_widget.addItem(empty_item)
+    def channels(self):
+        filtered_layers = self.get_sections()[SECTION_KEYS[self.current_section]]
 
-            # Keep the button on even if the list is empty
-            self.action_button.setEnabled(True)
-            self.channel_list_widget.is_empty_layer_present = True
+        # The layers marked as added only stay marked for the same node and section
+        self.channel_list_widget.set_source((self.viewed_node.fullName(), self.current_section))
+        if filtered_layers:
+            self.channel_list_widget.set_layers(filtered_layers)
         else:
-            self.action_button.setEnabled(True)
-            self.channel_list_widget.is_empty_layer_present = False
-
-    def get_filtered_layers(self, all_layers):
-        """Keep the button on even if the list is empty"""
-        keywords = self.section_keywords
-        exclusion_keywords = keywords.get("Exclusion Keywords", [])
-
-        # Exclude layers containing exclusion keywords
-        filtered_layers = [layer for layer in all_layers if not any(kw in layer for kw in exclusion_keywords)]
-
-        # Function to get the main prefix of a layer (up to the next '_' or '-')
-        def get_prefix(layer):
-            if '_' in layer:
-                return layer.split('_')[0]
-            elif '-' in layer:
-                return layer.split('-')[0]
-            else:
-                return layer
-
-        # Function to check if a layer exactly matches a keyword or prefix
-        def matches_keyword(layer, section_keywords):
-            prefix = get_prefix(layer)
-            for kw in section_keywords:
-                if len(kw) == 1:
-                    if layer == kw or prefix == kw:
-                        return True
-                elif len(kw) > 1:
-                    if prefix == kw or kw in layer:
-                        return True
-            return False
-
-        # Prioritize keywords "custom Layer"
-        custom_layers = [layer for layer in filtered_layers if matches_keyword(layer, keywords["custom Layer"])]
-        filtered_layers = [layer for layer in filtered_layers if layer not in custom_layers]
-
-        # Filtering for each remaining section
-        light_layers = [layer for layer in filtered_layers if matches_keyword(layer, keywords["Light Layer"])]
-        mask_layers = [layer for layer in filtered_layers if matches_keyword(layer, keywords["Mask Layer"])]
-        tech_layers = [layer for layer in filtered_layers if matches_keyword(layer, keywords["Tech Layer"])]
-        utils_layers = [layer for layer in filtered_layers if matches_keyword(layer, keywords["Utility Layer"])]
-
-        # Identify unclassified layers and avoid duplicates
-        classified_layers = set(light_layers + mask_layers + tech_layers + utils_layers + custom_layers)
-        unclassified_layers = [layer for layer in filtered_layers if layer not in classified_layers]
-
-        # Add unclassified layers to "Tech Layer"
-        tech_layers += unclassified_layers
-
-        # Remove duplicates in each section
-        light_layers = list(set(light_layers))
-        mask_layers = list(set(mask_layers))
-        tech_layers = list(set(tech_layers))
-        utils_layers = list(set(utils_layers))
-        custom_layers = list(set(custom_layers))
+            self.channel_list_widget.set_placeholder()
 
-        if self.current_section == 0:
-            return sorted(light_layers)
-        elif self.current_section == 1:
-            return sorted(mask_layers)
-        elif self.current_section == 2:
-            return sorted(tech_layers)
-        elif self.current_section == 3:
-            return sorted(utils_layers)
-        elif self.current_section == 4:
-            return sorted(custom_layers)
-        return []
+        # Keep the button on even if the list is empty
+        self.action_button.setEnabled(True)
+        self.channel_list_widget.is_empty_layer_present = not filtered_layers
 
     def prev_section(self):
         if self.mode == 'Artist':
@@ -1293,7 +1309,6 @@ class LayerManagerUI(QWidget):
                 self.current_section -= 1
         else:
             self.current_section = (self.current_section - 1) % 5
-        self.channels()
         self.update_section_label()
 
     def next_section(self):
@@ -1306,15 +1321,10 @@ class LayerManagerUI(QWidget):
                 self.current_section = (self.current_section + 1) % 4
         else:
             self.current_section = (self.current_section + 1) % 5
-        self.channels()
         self.update_section_label()
 
     def print_current_section_layers(self):
-        self.active_viewer = nuke.activeViewer().node()
-        viewer = self.active_viewer.input(nuke.activeViewer().activeInput())
-        all_layers = list(set([layer.split('.')[0] for layer in viewer.channels()]))
-
-        filtered_layers = self.get_filtered_layers(all_layers)
+        filtered_layers = self.get_sections()[SECTION_KEYS[self.current_section]]
         print(f"Layers in section {self.current_section}: {filtered_layers}")
 
     def getSectionText(self):
@@ -1342,19 +1352,19 @@ class LayerManagerUI(QWidget):
     def keyPressEvent(self, event):
         print(f"LayerManagerUI captured key: {event.key()}")
         current_row = self.channel_list_widget.currentRow()
-        selected_item = self.channel_list_widget.currentItem()
+        selected_layer = self.channel_list_widget.currentLayer()
 
         # Shortcut section 0 : G = create_GradeAOV
         if event.key() == Qt.Key_G and self.current_section == 0:
             print("Shortcut: G - Create Grade AOV")
-            if selected_item:
-                self.create_gradeaov(selected_item)
+            if selected_layer:
+                self.create_gradeaov(selected_layer, self.get_light_layers(selected_layer))
 
         # Shortcut  section 4 : G = create_contribution
         elif event.key() == Qt.Key_G and self.current_section == 4:
             print("Shortcut: G - Create contribution")
-            if selected_item:
-                self.create_contribution(selected_item)
+            if selected_layer:
+                self.create_contribution(selected_layer)
 
         # Navigation or other shortcuts
         elif event.key() == Qt.Key_Escape:
@@ -1376,13 +1386,13 @@ class LayerManagerUI(QWidget):
 
     def update_viewer_channel(self, row):
         if row != -1:
-            item = self.channel_list_widget.item(row)
-            if item:
-                self.last_selected_layer = item.text()
+            layer = self.channel_list_widget.layer(row)
+            if layer is not None:
+                self.last_selected_layer = layer
                 print(f"Memory updated: Last selected layer is '{self.last_selected_layer}'")
-                nuke.executeInMainThread(self.set_channel, item.text())
+                self.channel_scheduler.request(layer)
             else:
-                print("No item found for the current row.")
+                print("No layer found for the current row.")
         else:
             print("Invalid row index.")
 
@@ -1403,8 +1413,8 @@ class LayerManagerUI(QWidget):
         except Exception as e:
             print(f"Error setting channel: {e}")
 
-    def itemClicked(self, item):
-        layer = item.text()
+    def itemClicked(self, layer):
+        self.channel_scheduler.cancel()
         self.set_channel(layer)
 
     def closeEvent(self, event):
@@ -1428,27 +1438,8 @@ def load_authorized_users(filepath):
         return []
 
 def load_section_keywords():
-    filepath = os.path.join(os.path.expanduser("~"), ".nuke", "layermanager_preferences.json")
-    if os.path.exists(filepath):
-        try:
-            with open(filepath, 'r') as file:
-                data = json.load(file)
-
-                # Check that "Custom Title" is a channel
-                if "custom Title" in data and not isinstance(data["custom Title"], str):
-                    data["custom Title"] = "custom"
-
-                return data
-        except Exception as e:
-            print(f"Failed to load section keywords: {e}")
-    return {
-        "Light Layer": [],
-        "Mask Layer": [],
-        "Tech Layer": [],
-        "Utility Layer": [],
-        "custom Layer": [],
-        "custom Title": "custom"
-    }
+    """Return the merged Layer Manager preferences, read from disk only when a source changed."""
+    return layerpreferences.layermanager_preferences.load()
 
 def run():
     if nuke.allNodes('Viewer'):
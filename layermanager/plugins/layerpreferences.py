@@ -0,0 +1,428 @@
+#------------------------------------------------------------------------------#
+#-------------------------------------------------------------------- HEADER --#
+
+"""
+:synopsis:
+    Preferences service shared by the Layer Manager modules.
+
+    Each preferences file is read lazily on first use, parsed and validated once,
+    and only read again when its modification time or size changes, so opening
+    the panels on a network home directory costs a single stat per access.
+
+    The Layer Manager preferences are resolved from an ordered search path
+    (studio, show, shot, ... then the user file) and merged into one snapshot.
+    The snapshot is cached on local disk along with the state of its sources,
+    so a new session only stats the sources and reads one local file until a
+    source changes.
+"""
+
+#------------------------------------------------------------------------------#
+#------------------------------------------------------------------- IMPORTS --#
+
+import copy
+import getpass
+import hashlib
+import json
+import os
+import stat
+import tempfile
+from layerclassifier import LayerClassifier
+from shufflemapping import normalize_mappings
+
+# ---------------------------------------------------------------------------- #
+# ----------------------------------------------------------------- GLOBALS -- #
+
+NUKE_PATH = os.path.join(os.path.expanduser("~"), ".nuke")
+LAYERMANAGER_PREFERENCES_PATH = os.path.join(NUKE_PATH, "layermanager_preferences.json")
+VIEWERPASS_PREFERENCES_PATH = os.path.join(NUKE_PATH, "viewerpass_preferences.json")
+
+# Ordered list (os.pathsep separated, lowest priority first) of preferences files or
+# folders holding a layermanager_preferences.json, e.g. studio:show:shot.
+# The user file always comes last.
+SEARCH_PATH_ENV = "LAYERMANAGER_PREFERENCES_PATH"
+# Local folder of the merged snapshot, defaults to a per-user folder in the temp dir
+CACHE_DIR_ENV = "LAYERMANAGER_CACHE_DIR"
+
+DEFAULT_CUSTOM_TITLE = "custom"
+LIST_KEYS = ["Exclusion Keywords", "Light Layer", "Mask Layer", "Tech Layer", "Utility Layer", "custom Layer"]
+# A keyword list entry starting with it removes that keyword of the lower levels
+REMOVAL_PREFIX = "-"
+
+DEFAULT_PREFERENCES = {
+    "Exclusion Keywords": [],
+    "Light Layer": [],
+    "Mask Layer": [],
+    "Tech Layer": [],
+    "Utility Layer": [],
+    "custom Layer": [],
+    "custom Title": DEFAULT_CUSTOM_TITLE
+}
+
+# Optional settings, dropped from the preferences when their value has the wrong type
+OPTIONAL_TYPES = {
+    "Channel Switch Delay": int,
+    "Channel Switch Immediate": bool,
+    "Contact Sheet Mode": str,
+    "Contact Sheet Tile Width": int,
+    "Contact Sheet Max Width": int,
+    "Contact Sheet Max Height": int,
+    "Shuffle2 Mappings": dict
+}
+
+#------------------------------------------------------------------------------#
+#----------------------------------------------------------------- FUNCTIONS --#
+
+def normalize_keywords(value):
+    """
+    Return a clean keyword list from a list or a comma separated string.
+
+    Keywords are stripped, and blank entries (e.g. from a trailing comma) and duplicates
+    are dropped, since an empty keyword would match every layer.
+    """
+    if isinstance(value, str):
+        value = value.split(",")
+    elif not isinstance(value, list):
+        return []
+
+    keywords = []
+    for keyword in value:
+        if not isinstance(keyword, str):
+            continue
+        keyword = keyword.strip()
+        if keyword and keyword not in keywords:
+            keywords.append(keyword)
+    return keywords
+
+
+def validate_layermanager_preferences(data):
+    """Normalize the keyword lists, the custom title and the optional settings."""
+    for key in LIST_KEYS:
+        data[key] = normalize_keywords(data.get(key))
+
+    # Check that "Custom Title" is a non empty string
+    if not isinstance(data.get("custom Title"), str) or not data["custom Title"].strip():
+        data["custom Title"] = DEFAULT_CUSTOM_TITLE
+    else:
+        data["custom Title"] = data["custom Title"].strip()
+
+    for key, value_type in OPTIONAL_TYPES.items():
+        if key in data and type(data[key]) is not value_type:
+            print(f"Ignoring invalid preference {key}: {data[key]!r}")
+            del data[key]
+    if data.get("Channel Switch Delay", 0) < 0:
+        del data["Channel Switch Delay"]
+    for key in ("Contact Sheet Tile Width", "Contact Sheet Max Width", "Contact Sheet Max Height"):
+        if data.get(key, 1) <= 0:
+            del data[key]
+    if "Shuffle2 Mappings" in data:
+        data["Shuffle2 Mappings"] = normalize_mappings(data["Shuffle2 Mappings"])
+    return data
+
+
+def diff_preferences(data, lower):
+    """
+    Return the part of data that the lower preference levels do not already provide.
+    Keywords of the lower levels missing from data are written as "-keyword" removals.
+    """
+    diff = {}
+    for key, value in data.items():
+        lower_value = lower.get(key)
+        if isinstance(value, list) and isinstance(lower_value, list):
+            diff[key] = [item for item in value if item not in lower_value] + [
+                REMOVAL_PREFIX + item for item in lower_value if isinstance(item, str) and item not in value]
+        elif isinstance(value, dict) and isinstance(lower_value, dict):
+            diff[key] = {name: item for name, item in value.items() if lower_value.get(name) != item}
+        elif key not in lower or lower_value != value:
+            diff[key] = value
+    return diff
+
+
+def write_json_atomic(filepath, data, indent=None):
+    """
+    Write data to a temp file next to filepath, then rename it over filepath.
+
+    A crash mid-write leaves the previous file untouched instead of a truncated one.
+    """
+    directory = os.path.dirname(filepath)
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix=".{}.".format(os.path.basename(filepath)), suffix=".tmp",
+                                     dir=directory)
+    try:
+        with os.fdopen(fd, 'w') as file:
+            json.dump(data, file, indent=indent)
+            file.flush()
+            os.fsync(file.fileno())
+        # Keep the permissions of the file we replace, mkstemp creates it user-only
+        try:
+            os.chmod(temp_path, stat.S_IMODE(os.stat(filepath).st_mode))
+        except OSError:
+            os.chmod(temp_path, 0o644)
+        os.replace(temp_path, filepath)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def merge_preferences(base, layer):
+    """
+    Merge a preferences layer into base, in place.
+
+    Keyword lists are combined (keeping order, without duplicates) so each level
+    adds its own keywords, and a "-keyword" entry removes a keyword of the lower
+    levels. Tables (e.g. the Shuffle2 mappings) are merged entry by entry, any other
+    value overrides the lower levels.
+    """
+    for key, value in layer.items():
+        if isinstance(value, list):
+            items = list(base[key]) if isinstance(base.get(key), list) else []
+            for item in value:
+                if isinstance(item, str) and item.startswith(REMOVAL_PREFIX):
+                    if item[len(REMOVAL_PREFIX):] in items:
+                        items.remove(item[len(REMOVAL_PREFIX):])
+                elif item not in items:
+                    items.append(item)
+            base[key] = items
+        elif isinstance(value, dict) and isinstance(base.get(key), dict):
+            base[key].update(copy.deepcopy(value))
+        else:
+            base[key] = copy.deepcopy(value)
+    return base
+
+
+def get_search_path():
+    """Return the ordered preferences files, lowest priority first and the user file last."""
+    paths = []
+    for entry in os.environ.get(SEARCH_PATH_ENV, "").split(os.pathsep):
+        entry = os.path.expanduser(os.path.expandvars(entry.strip()))
+        if not entry:
+            continue
+        if os.path.isdir(entry):
+            entry = os.path.join(entry, os.path.basename(LAYERMANAGER_PREFERENCES_PATH))
+        if entry != LAYERMANAGER_PREFERENCES_PATH and entry not in paths:
+            paths.append(entry)
+    paths.append(LAYERMANAGER_PREFERENCES_PATH)
+    return paths
+
+
+def get_snapshot_path(paths):
+    """Return the local snapshot file of a search path."""
+    cache_dir = os.environ.get(CACHE_DIR_ENV)
+    if not cache_dir:
+        try:
+            user = getpass.getuser()
+        except Exception:
+            user = "unknown_user"
+        cache_dir = os.path.join(tempfile.gettempdir(), "layermanager_{}".format(user))
+    digest = hashlib.sha1(os.pathsep.join(paths).encode("utf-8")).hexdigest()[:12]
+    return os.path.join(cache_dir, "preferences_{}.json".format(digest))
+
+
+class PreferencesFile(object):
+    """
+    A JSON preferences file loaded lazily and cached until it changes on disk.
+    """
+
+    def __init__(self, filepath, defaults=None, validate=None):
+        self.filepath = filepath
+        self.defaults = defaults or {}
+        self.validate = validate
+        self.data = None
+        self.stat_key = None
+        self.error = None
+        self.version = 0
+
+    def get_stat_key(self):
+        """Return (mtime, size) of the file, None when it does not exist."""
+        try:
+            file_stat = os.stat(self.filepath)
+        except OSError:
+            return None
+        return file_stat.st_mtime_ns, file_stat.st_size
+
+    def load(self, copy_data=True):
+        """
+        Return the parsed preferences, reading the file only if it changed.
+
+        The defaults are returned when the file is missing or cannot be read, the
+        reason is kept in `error`. Callers that do not modify the result can pass
+        copy_data=False to share the cached dict.
+        """
+        stat_key = self.get_stat_key()
+        if self.data is None or stat_key != self.stat_key:
+            self.data = self.read(stat_key)
+            self.stat_key = stat_key
+            self.version += 1
+        return copy.deepcopy(self.data) if copy_data else self.data
+
+    def read(self, stat_key):
+        self.error = None
+        data = copy.deepcopy(self.defaults)
+        if stat_key is not None:
+            try:
+                with open(self.filepath, 'r') as file:
+                    data = json.load(file)
+                if not isinstance(data, dict):
+                    raise ValueError("expected a JSON object")
+            except Exception as e:
+                self.error = e
+                print(f"Failed to load preferences {self.filepath}: {e}")
+                data = copy.deepcopy(self.defaults)
+
+        if self.validate:
+            data = self.validate(data)
+        return data
+
+    def store(self, data):
+        """Atomically write data to the file and keep it as the cached content."""
+        write_json_atomic(self.filepath, data, indent=4)
+        self.data = data
+        self.stat_key = self.get_stat_key()
+        self.error = None
+        self.version += 1
+
+    def invalidate(self):
+        """Force the next load to read the file again."""
+        self.data = None
+
+
+class LayeredPreferences(object):
+    """
+    Preferences merged from an ordered search path into one cached snapshot.
+
+    Each load stats the sources, which are only read again when one of them
+    changed. The merged result and its compiled LayerClassifier are shared until then.
+    """
+
+    def __init__(self, paths, defaults=None, validate=None, snapshot_path=None):
+        self.sources = [PreferencesFile(path) for path in paths]
+        self.defaults = defaults or {}
+        self.validate = validate
+        self.snapshot_path = snapshot_path
+        self.data = None
+        self.source_keys = None
+        self.version = 0
+        self.compiled_classifier = None
+        self.snapshot_hash = None
+
+    @property
+    def filepath(self):
+        """The user preferences file, the one the preferences dialog writes."""
+        return self.sources[-1].filepath
+
+    @property
+    def error(self):
+        for source in self.sources:
+            if source.error:
+                return source.error
+        return None
+
+    def load(self, copy_data=True):
+        """Return the merged preferences, merging the sources again only when one of them changed."""
+        if self.data is None:
+            self.read_snapshot()
+
+        source_keys = [source.get_stat_key() for source in self.sources]
+        if self.data is None or source_keys != self.source_keys:
+            self.merge(source_keys)
+            self.write_snapshot()
+
+        return copy.deepcopy(self.data) if copy_data else self.data
+
+    def merge(self, source_keys):
+        data = copy.deepcopy(self.defaults)
+        for source in self.sources:
+            merge_preferences(data, source.load(copy_data=False))
+        if self.validate:
+            data = self.validate(data)
+
+        self.data = data
+        self.source_keys = source_keys
+        self.version += 1
+        self.compiled_classifier = None
+
+    def save(self, preferences):
+        """
+        Validate the preferences and atomically save them as the user level.
+
+        Only what the lower levels do not already provide is written to the user file.
+        The new merged snapshot is returned, its classifier is compiled in-process
+        without reading the saved file back.
+        """
+        preferences = copy.deepcopy(preferences)
+        if self.validate:
+            preferences = self.validate(preferences)
+
+        lower = {}
+        for source in self.sources[:-1]:
+            merge_preferences(lower, source.load(copy_data=False))
+        self.sources[-1].store(diff_preferences(preferences, lower))
+
+        self.merge([source.get_stat_key() for source in self.sources])
+        self.write_snapshot()
+        return copy.deepcopy(self.data)
+
+    def get_classifier(self):
+        """Return the LayerClassifier compiled from the merged keywords, built once per snapshot."""
+        data = self.load(copy_data=False)
+        if self.compiled_classifier is None:
+            self.compiled_classifier = LayerClassifier(data)
+        return self.compiled_classifier
+
+    def read_snapshot(self):
+        """Adopt the local snapshot if it was merged from the same search path."""
+        if not self.snapshot_path:
+            return
+        try:
+            with open(self.snapshot_path, 'r') as file:
+                snapshot = json.load(file)
+            if snapshot["paths"] != [source.filepath for source in self.sources]:
+                return
+            source_keys = [tuple(key) if key else None for key in snapshot["source_keys"]]
+            data = snapshot["preferences"]
+        except Exception:
+            return
+
+        self.data = data
+        self.source_keys = source_keys
+        self.version += 1
+        self.compiled_classifier = None
+        self.snapshot_hash = self.get_snapshot_hash()
+
+    def get_snapshot_hash(self):
+        """Return the hash of the snapshot content."""
+        content = json.dumps([[source.filepath for source in self.sources], self.source_keys, self.data],
+                             sort_keys=True)
+        return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+    def write_snapshot(self):
+        """Write the snapshot, only when its content changed since it was last read or written."""
+        if not self.snapshot_path:
+            return
+        snapshot_hash = self.get_snapshot_hash()
+        if snapshot_hash == self.snapshot_hash:
+            return
+        snapshot = {
+            "paths": [source.filepath for source in self.sources],
+            "source_keys": self.source_keys,
+            "preferences": self.data
+        }
+        try:
+            write_json_atomic(self.snapshot_path, snapshot)
+            self.snapshot_hash = snapshot_hash
+        except Exception as e:
+            print(f"Failed to write preferences snapshot {self.snapshot_path}: {e}")
+
+    def invalidate(self):
+        """Merge the sources again on the next load."""
+        self.source_keys = None
+
+
+def create_layermanager_preferences():
+    paths = get_search_path()
+    return LayeredPreferences(paths, DEFAULT_PREFERENCES, validate_layermanager_preferences,
+                              snapshot_path=get_snapshot_path(paths))
+
+
+layermanager_preferences = create_layermanager_preferences()
+viewerpass_preferences = PreferencesFile(VIEWERPASS_PREFERENCES_PATH)
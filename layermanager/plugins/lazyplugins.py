@@ -0,0 +1,49 @@
+#------------------------------------------------------------------------------#
+#-------------------------------------------------------------------- HEADER --#
+
+"""
+:synopsis:
+    Lightweight stubs registered by menu.py in place of the plugin functions.
+
+    A stub imports the module of its function on its first call only, so
+    starting Nuke (or a `nuke -t` job) does not import the Layer Manager UI,
+    PySide2 or the gizmo modules until a command or a callback needs them.
+"""
+
+#------------------------------------------------------------------------------#
+#------------------------------------------------------------------- IMPORTS --#
+
+import importlib
+
+import nuke
+import deferredinit
+
+#------------------------------------------------------------------------------#
+#----------------------------------------------------------------- FUNCTIONS --#
+
+def lazy_function(module_name, function_name):
+    """Return a stub calling module_name.function_name, imported on the first call."""
+    def stub(*args, **kwargs):
+        module = importlib.import_module(module_name)
+        return getattr(module, function_name)(*args, **kwargs)
+
+    stub.__name__ = function_name
+    stub.__qualname__ = "{}.{}".format(module_name, function_name)
+    return stub
+
+
+def lazy_on_create(module_name, function_name):
+    """
+    Return an onCreate callback initialising the node with module_name.function_name(node).
+    While a script loads the node is deferred without importing the module.
+    """
+    initialize = lazy_function(module_name, function_name)
+
+    def on_create():
+        node = nuke.thisNode()
+        if not deferredinit.defer(node, initialize):
+            initialize(node)
+
+    on_create.__name__ = "on_create"
+    on_create.__qualname__ = "{}.{}".format(module_name, function_name)
+    return on_create
@@ -0,0 +1,174 @@
+#------------------------------------------------------------------------------#
+#-------------------------------------------------------------------- HEADER --#
+
+"""
+:synopsis:
+    Node graph placement service of the Layer Manager.
+
+    Keeps the bounding boxes of the nodes of a group in a spatial index of grid
+    buckets, built with a single pass over the group, and finds the nearest free
+    slot next to a source node by only checking the buckets around each candidate.
+    New nodes are placed without autoplace and never stack on top of each other.
+
+    The index of each group is kept between placements and only trusted while
+    the group holds the same number of nodes and none of them moved, which is
+    checked on each use without rebuilding the buckets.
+"""
+
+#------------------------------------------------------------------------------#
+#------------------------------------------------------------------- IMPORTS --#
+
+import nuke
+
+# ---------------------------------------------------------------------------- #
+# ----------------------------------------------------------------- GLOBALS -- #
+
+BUCKET_SIZE = 256
+
+# Room kept around the placed nodes
+MARGIN_X = 30
+MARGIN_Y = 30
+
+# Size of a standard node, used before a node exists
+DEFAULT_NODE_WIDTH = 80
+DEFAULT_NODE_HEIGHT = 18
+
+# Rings of candidate slots tried around the preferred position
+MAX_RINGS = 64
+
+# Group full name ("" for the root) -> PlacementIndex
+_placement_indexes = {}
+
+#------------------------------------------------------------------------------#
+#----------------------------------------------------------------- FUNCTIONS --#
+
+class PlacementIndex(object):
+    """
+    Spatial index of node bounding boxes in grid buckets.
+    """
+
+    def __init__(self, bucket_size=BUCKET_SIZE):
+        self.bucket_size = bucket_size
+        self.buckets = {}
+        # (node, xpos, ypos) of the indexed nodes
+        self.nodes = []
+
+    def get_bucket_range(self, x, y, width, height):
+        size = self.bucket_size
+        for bucket_x in range(x // size, (x + width) // size + 1):
+            for bucket_y in range(y // size, (y + height) // size + 1):
+                yield bucket_x, bucket_y
+
+    def add(self, x, y, width, height):
+        """Add a bounding box to the index."""
+        box = (x, y, x + width, y + height)
+        for bucket in self.get_bucket_range(x, y, width, height):
+            self.buckets.setdefault(bucket, []).append(box)
+
+    def add_node(self, node):
+        x, y = node.xpos(), node.ypos()
+        self.add(x, y, node.screenWidth(), node.screenHeight())
+        self.nodes.append((node, x, y))
+
+    def is_current(self, node_count):
+        """Return True when the group still holds node_count nodes, the indexed ones where they were."""
+        if node_count != len(self.nodes):
+            return False
+        try:
+            return all(node.xpos() == x and node.ypos() == y for node, x, y in self.nodes)
+        except ValueError:
+            # An indexed node was deleted
+            return False
+
+    def is_free(self, x, y, width, height, margin_x=MARGIN_X, margin_y=MARGIN_Y):
+        """Return True when no indexed box overlaps the box grown by the margins."""
+        left, top = x - margin_x, y - margin_y
+        right, bottom = x + width + margin_x, y + height + margin_y
+        for bucket in self.get_bucket_range(left, top, right - left, bottom - top):
+            for box_left, box_top, box_right, box_bottom in self.buckets.get(bucket, ()):
+                if box_left < right and left < box_right and box_top < bottom and top < box_bottom:
+                    return False
+        return True
+
+    def find_free_slot(self, x, y, width, height, margin_x=MARGIN_X, margin_y=MARGIN_Y, max_rings=MAX_RINGS):
+        """
+        Return the free (x, y) nearest to the preferred position, and reserve it.
+
+        Candidates are taken ring by ring on a grid of the box size, at or below the
+        preferred row, closest first and below before beside.
+        """
+        step_x = width + margin_x
+        step_y = height + margin_y
+        for ring in range(max_rings):
+            candidates = sorted(
+                ((column, row) for row in range(ring + 1) for column in range(-ring, ring + 1)
+                 if max(abs(column), row) == ring),
+                key=lambda slot: (abs(slot[0]) + slot[1], slot[1], abs(slot[0]), -slot[0]))
+            for column, row in candidates:
+                slot_x = x + column * step_x
+                slot_y = y + row * step_y
+                if self.is_free(slot_x, slot_y, width, height, margin_x, margin_y):
+                    self.add(slot_x, slot_y, width, height)
+                    return slot_x, slot_y
+
+        # Crowded area, fall back under the last ring
+        slot_x, slot_y = x, y + max_rings * step_y
+        self.add(slot_x, slot_y, width, height)
+        return slot_x, slot_y
+
+    @classmethod
+    def from_nodes(cls, nodes, bucket_size=BUCKET_SIZE):
+        index = cls(bucket_size)
+        for node in nodes:
+            index.add_node(node)
+        return index
+
+
+def is_placed(node):
+    return node.Class() != "Viewer"
+
+
+def get_placement_index(group=None):
+    """
+    Return the PlacementIndex of the nodes of a group (the current one by default).
+    The index of the last call is returned again while the group did not change.
+    """
+    group = group or nuke.thisGroup() or nuke.root()
+    group_name = "" if group.Class() == "Root" else group.fullName()
+    with group:
+        nodes = [node for node in nuke.allNodes() if is_placed(node)]
+    index = _placement_indexes.get(group_name)
+    if index is None or not index.is_current(len(nodes)):
+        index = PlacementIndex.from_nodes(nodes)
+        _placement_indexes[group_name] = index
+    return index
+
+
+def get_position_under(source_node, width=DEFAULT_NODE_WIDTH):
+    """Return the preferred position of a node of `width` under source_node, centred on it."""
+    return (int(source_node.xpos() + source_node.screenWidth() / 2 - width / 2),
+            int(source_node.ypos() + source_node.screenHeight() + MARGIN_Y))
+
+
+def place_under(node, source_node, index=None):
+    """Move node to the nearest free slot under source_node and return its position."""
+    index = index or get_placement_index()
+    width, height = node.screenWidth(), node.screenHeight()
+    x, y = index.find_free_slot(*get_position_under(source_node, width), width=width, height=height)
+    node.setXYpos(x, y)
+    # Its box is already reserved, only track its position
+    index.nodes.append((node, x, y))
+    return x, y
+
+
+def find_free_grid(source_node, columns, rows, cell_width, cell_height, index=None):
+    """
+    Return the (x, y) of a free area for a grid of nodes under source_node, and reserve it.
+    Cells are cell_width x cell_height, spacing included.
+    """
+    index = index or get_placement_index()
+    width = columns * cell_width
+    height = rows * cell_height
+    x, y = get_position_under(source_node, cell_width)
+    return index.find_free_slot(x, y, width, height)
+
@@ -4,9 +4,13 @@
 # Copyright (c) 2024, David Francois
 # ----------------------------------------------------------------------------------------------------------
 
+import math
 import nuke
 from PySide2.QtCore import QTimer
 
+import nodeplacement
+import shufflemapping
+
 # Define the timer and double-click state
 click_timer = QTimer()
 click_timer.setSingleShot(True)  # Ensure the timer is in singleShot mode
@@ -14,6 +18,10 @@ is_double_click = False
 knob_callback_short = None  # Callback for single-click updates
 knob_callback_long = None   # Callback for double-click updates
 
+# Spacing of the Shuffle2 grid created by shuffle_out_layers
+GRID_SPACING_X = 110
+GRID_SPACING_Y = 60
+
 # Connect to the timer for single-click
 click_timer.timeout.connect(lambda: single_click())
 
@@ -243,3 +251,35 @@ def to_label_short(node):
     elif is_shuffle_node(node):
         label = process_shuffle(node, short_label=True)
     node['label'].setValue(label)
+
+# ----------------------------------------------------------------------------------------------------------
+# Bulk creation
+# ----------------------------------------------------------------------------------------------------------
+
+def shuffle_out_layers(source_node, layers, layer_index, mapping_table=None):
+    """
+    Create one Shuffle2 per layer under source_node, laid out in a grid, in a single undo step.
+    The nodes are created without autoplace or control panel, and returned in the layers order.
+    """
+    columns = max(1, int(math.ceil(math.sqrt(len(layers)))))
+    rows = int(math.ceil(len(layers) / float(columns)))
+    start_x, start_y = nodeplacement.find_free_grid(source_node, columns, rows, GRID_SPACING_X, GRID_SPACING_Y)
+
+    undo = nuke.Undo()
+    undo.begin("Shuffle out {} layers".format(len(layers)))
+    try:
+        nodes = []
+        for i, layer in enumerate(layers):
+            row, column = divmod(i, columns)
+            node = nuke.nodes.Shuffle2(inputs=[source_node], label=layer,
+                                       xpos=start_x + column * GRID_SPACING_X, ypos=start_y + row * GRID_SPACING_Y)
+            node['in1'].setValue(layer)
+            mappings = shufflemapping.resolve_mappings(layer, layer_index, mapping_table)
+            if mappings:
+                node['mappings'].setValue(mappings)
+            nodes.append(node)
+    except Exception:
+        undo.cancel()
+        raise
+    undo.end()
+    return nodes
@@ -0,0 +1,105 @@
+#------------------------------------------------------------------------------#
+#-------------------------------------------------------------------- HEADER --#
+
+"""
+:synopsis:
+    Declarative Shuffle2 mapping table of the Layer Manager.
+
+    Each layer maps to a list of [source, target] rules: the source is a channel
+    of the layer ("X"), a channel of another layer ("forward.u") or a constant
+    ("black", "white"), the target an rgba channel ("red"). Layers missing from
+    the table use the "default" rules. The table is extended or overridden by the
+    "Shuffle2 Mappings" preference.
+
+    Rules are resolved against the shared layer index of the input node, so a
+    Shuffle2 only looks at the channels of the layers it reads.
+"""
+
+#------------------------------------------------------------------------------#
+#------------------------------------------------------------------- IMPORTS --#
+
+# ---------------------------------------------------------------------------- #
+# ----------------------------------------------------------------- GLOBALS -- #
+
+DEFAULT_RULES_KEY = "default"
+CONSTANTS = ["black", "white"]
+TARGETS = ["red", "green", "blue", "alpha"]
+
+DEFAULT_SHUFFLE2_MAPPINGS = {
+    "motion": [["forward.u", "red"], ["forward.v", "green"], ["backward.u", "blue"], ["backward.v", "alpha"]],
+    "N": [["X", "red"], ["Y", "green"], ["Z", "blue"], ["black", "alpha"]],
+    "N_filter": [["X", "red"], ["Y", "green"], ["Z", "blue"], ["black", "alpha"]],
+    "P": [["X", "red"], ["Y", "green"], ["Z", "blue"], ["black", "alpha"]],
+    "P_filter": [["X", "red"], ["Y", "green"], ["Z", "blue"], ["black", "alpha"]],
+    "depth": [["Z", "red"], ["black", "green"], ["black", "blue"], ["black", "alpha"]],
+    "rfx_depth": [["Z", "red"], ["black", "green"], ["black", "blue"], ["black", "alpha"]],
+    "other": [["caustic", "red"], ["glint", "green"], ["rfx_depth", "blue"], ["black", "alpha"]],
+    # Any other layer: its rgb channels, with the red channel copied to the alpha
+    DEFAULT_RULES_KEY: [["red", "red"], ["green", "green"], ["blue", "blue"], ["red", "alpha"]],
+}
+
+#------------------------------------------------------------------------------#
+#----------------------------------------------------------------- FUNCTIONS --#
+
+def normalize_mappings(value):
+    """Return the valid {layer: [[source, target], ...]} rules of a mapping table."""
+    if not isinstance(value, dict):
+        return {}
+
+    mappings = {}
+    for layer, rules in value.items():
+        if not isinstance(rules, list):
+            continue
+        valid_rules = [
+            [rule[0], rule[1]] for rule in rules
+            if isinstance(rule, list) and len(rule) == 2 and isinstance(rule[0], str) and rule[1] in TARGETS]
+        if valid_rules:
+            mappings[layer] = valid_rules
+    return mappings
+
+
+def get_mapping_table(preferences_mappings=None):
+    """Return the default table overridden, layer by layer, by the preferences one."""
+    table = dict(DEFAULT_SHUFFLE2_MAPPINGS)
+    table.update(preferences_mappings or {})
+    return table
+
+
+def resolve_source(layer, source, layer_index):
+    """
+    Return the (input, channel) of a rule source, or None when the input lacks the channel.
+    Constants read from no input (-1).
+    """
+    if source in CONSTANTS:
+        return -1, source
+
+    source_layer, _, channel = source.rpartition(".")
+    if not source_layer:
+        source_layer = layer
+    channel = "{}.{}".format(source_layer, channel)
+    if channel in layer_index.channels(source_layer):
+        return 0, channel
+    return None
+
+
+def resolve_mappings(layer, layer_index, table=None):
+    """
+    Return the Shuffle2 mappings [(input, source channel, rgba channel), ...] of a layer.
+
+    Rules whose source is not available are skipped, and the first available rule of
+    each target wins.
+    """
+    table = table or DEFAULT_SHUFFLE2_MAPPINGS
+    rules = table.get(layer) or table.get(DEFAULT_RULES_KEY, [])
+
+    mappings = []
+    mapped_targets = set()
+    for source, target in rules:
+        if target in mapped_targets:
+            continue
+        resolved = resolve_source(layer, source, layer_index)
+        if resolved is None:
+            continue
+        mappings.append((resolved[0], resolved[1], "rgba.{}".format(target)))
+        mapped_targets.add(target)
+    return mappings
@@ -0,0 +1,201 @@
+#------------------------------------------------------------------------------#
+#-------------------------------------------------------------------- HEADER --#
+
+"""
+:synopsis:
+    Minimal in-memory `nuke` module for the unit tests.
+
+    Nodes hold knobs and, for groups, child nodes. Entering a node with `with`
+    makes it the group searched by toNode, like Nuke does. Callbacks registered
+    with the add* functions are recorded in `callbacks`.
+"""
+
+#------------------------------------------------------------------------------#
+#------------------------------------------------------------------- IMPORTS --#
+
+import os
+import sys
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PLUGINS_PATH = os.path.join(ROOT, "layermanager", "plugins")
+
+#------------------------------------------------------------------------------#
+#----------------------------------------------------------------- FUNCTIONS --#
+
+class Knob(object):
+
+    def __init__(self, name, value=""):
+        self._name = name
+        self._value = value
+        self._label = name
+        self.enabled = True
+        self.visible = True
+
+    def name(self):
+        return self._name
+
+    def value(self):
+        return self._value
+
+    def setValue(self, value):
+        self._value = value
+
+    def label(self):
+        return self._label
+
+    def setLabel(self, label):
+        self._label = label
+
+    def setEnabled(self, enabled):
+        self.enabled = enabled
+
+    def setVisible(self, visible):
+        self.visible = visible
+
+    def setFlag(self, flag):
+        pass
+
+
+class Menu(object):
+
+    def __init__(self):
+        self.commands = {}
+
+    def addMenu(self, name):
+        return self
+
+    def addCommand(self, name, command=None, shortcut=None):
+        self.commands[name] = command
+
+
+class Node(object):
+
+    def __init__(self, name, node_class="Group", **knob_values):
+        self._name = name
+        self._class = node_class
+        self._knobs = dict((knob_name, Knob(knob_name, value)) for knob_name, value in knob_values.items())
+        self.children = {}
+        self.inputs = {}
+        self.parent = None
+        self.x = 0
+        self.y = 0
+        self.channel_list = []
+
+    def name(self):
+        return self._name
+
+    def fullName(self):
+        if self.parent is None or self.parent.Class() == "Root":
+            return self._name
+        return "{}.{}".format(self.parent.fullName(), self._name)
+
+    def Class(self):
+        return self._class
+
+    def knobs(self):
+        return dict(self._knobs)
+
+    def addKnob(self, knob):
+        self._knobs[knob.name()] = knob
+
+    def __getitem__(self, knob_name):
+        return self._knobs[knob_name]
+
+    def add(self, node):
+        node.parent = self
+        self.children[node.name()] = node
+        return node
+
+    def xpos(self):
+        return self.x
+
+    def ypos(self):
+        return self.y
+
+    def setXYpos(self, x, y):
+        self.x = x
+        self.y = y
+
+    def screenWidth(self):
+        return 80
+
+    def screenHeight(self):
+        return 18
+
+    def channels(self):
+        return list(self.channel_list)
+
+    def input(self, index):
+        return self.inputs.get(index)
+
+    def setInput(self, index, node):
+        self.inputs[index] = node
+
+    def __enter__(self):
+        _module.groups.append(self)
+        return self
+
+    def __exit__(self, *args):
+        _module.groups.pop()
+
+
+def create_module():
+    nuke = types.ModuleType("nuke")
+    nuke.GUI = False
+    nuke.INVISIBLE = 0x400
+    nuke.root_node = Node("root", "Root")
+    nuke.groups = [nuke.root_node]
+    nuke.this_node = None
+    nuke.callbacks = {}
+    nuke.messages = []
+    nuke.main_menu = Menu()
+
+    def add_callback(kind):
+        def add(function, args=(), kwargs={}, nodeClass="*"):
+            nuke.callbacks.setdefault((kind, nodeClass), []).append(function)
+        return add
+
+    def to_node(name):
+        return nuke.groups[-1].children.get(name)
+
+    def all_nodes(node_class=None):
+        return [node for node in nuke.groups[-1].children.values() if node_class in (None, node.Class())]
+
+    def delete(node):
+        node.parent.children.pop(node.name(), None)
+
+    nuke.Node = Node
+    nuke.Knob = Knob
+    nuke.String_Knob = Knob
+    nuke.toNode = to_node
+    nuke.delete = delete
+    nuke.allNodes = all_nodes
+    nuke.root = lambda: nuke.root_node
+    nuke.thisGroup = lambda: nuke.groups[-1]
+    nuke.thisNode = lambda: nuke.this_node
+    nuke.thisKnob = lambda: None
+    nuke.message = nuke.messages.append
+    nuke.menu = lambda name: nuke.main_menu
+    nuke.pluginAddPath = lambda path: None
+    nuke.executeInMainThread = lambda function, args=(): function(*args)
+    nuke.addOnCreate = add_callback("onCreate")
+    nuke.addOnUserCreate = add_callback("onUserCreate")
+    nuke.addOnDestroy = add_callback("onDestroy")
+    nuke.addOnScriptLoad = add_callback("onScriptLoad")
+    nuke.addKnobChanged = add_callback("knobChanged")
+    return nuke
+
+
+def install():
+    """Install the fake `nuke` module, shared by every test, and put the plugins on the path."""
+    global _module
+    if _module is None:
+        _module = create_module()
+    sys.modules["nuke"] = _module
+    if PLUGINS_PATH not in sys.path:
+        sys.path.insert(0, PLUGINS_PATH)
+    return _module
+
+
+_module = None
@@ -0,0 +1,42 @@
+#------------------------------------------------------------------------------#
+#-------------------------------------------------------------------- HEADER --#
+
+"""
+:synopsis:
+    Tests of the contact sheet source lookup, against the fake `nuke` module.
+"""
+
+#------------------------------------------------------------------------------#
+#------------------------------------------------------------------- IMPORTS --#
+
+import unittest
+
+import fakenuke
+
+nuke = fakenuke.install()
+
+import contactsheet
+
+#------------------------------------------------------------------------------#
+#----------------------------------------------------------------- FUNCTIONS --#
+
+class FindContactSheetTest(unittest.TestCase):
+
+    def setUp(self):
+        nuke.root_node.children.clear()
+        self.source = nuke.root_node.add(fakenuke.Node("Read1", "Read"))
+        self.sheet = nuke.root_node.add(fakenuke.Node("Light_ContactSheet", "Group"))
+        self.sheet.addKnob(fakenuke.Knob(contactsheet.TAG_KNOB, "Light"))
+        self.sheet.setInput(0, self.source)
+
+    def test_a_selected_contact_sheet_resolves_to_its_source(self):
+        self.assertIs(contactsheet.get_source_node(self.sheet), self.source)
+        self.assertIs(contactsheet.get_source_node(self.source), self.source)
+
+    def test_the_selected_contact_sheet_finds_itself(self):
+        self.assertIs(contactsheet.find_contact_sheet(self.sheet, "Light"), self.sheet)
+        self.assertIsNone(contactsheet.find_contact_sheet(self.sheet, "Mask"))
+
+
+if __name__ == "__main__":
+    unittest.main()
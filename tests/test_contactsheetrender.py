@@ -0,0 +1,99 @@
+#------------------------------------------------------------------------------#
+#-------------------------------------------------------------------- HEADER --#
+
+"""
+:synopsis:
+    Tests of the contact sheet render controller: job planning, worker command
+    lines and worker pool.
+"""
+
+#------------------------------------------------------------------------------#
+#------------------------------------------------------------------- IMPORTS --#
+
+import json
+import os
+import threading
+import time
+import unittest
+from collections import OrderedDict
+
+import fakenuke
+
+nuke = fakenuke.install()
+
+import contactsheetrender
+
+#------------------------------------------------------------------------------#
+#----------------------------------------------------------------- FUNCTIONS --#
+
+class Result(object):
+
+    def __init__(self, returncode):
+        self.returncode = returncode
+
+
+class PlanTest(unittest.TestCase):
+
+    def test_frame_chunks_cover_the_range_once(self):
+        self.assertEqual(contactsheetrender.get_frame_chunks(1001, 1025, 10),
+                         [(1001, 1010), (1011, 1020), (1021, 1025)])
+        self.assertEqual(contactsheetrender.get_frame_chunks(1001, 1001, 0), [(1001, 1001)])
+
+    def test_every_section_is_split_in_the_same_chunks(self):
+        section_layers = OrderedDict([("Light Layer", ["key", "fill"]), ("Mask Layer", ["crypto"])])
+        jobs = contactsheetrender.plan_jobs(section_layers, 1, 20, 8, "/review/{shot}/{section}.####.jpg", "/shots/sh010.nk")
+
+        self.assertEqual([(job.section, job.first, job.last) for job in jobs], [
+            ("Light Layer", 1, 8), ("Light Layer", 9, 16), ("Light Layer", 17, 20),
+            ("Mask Layer", 1, 8), ("Mask Layer", 9, 16), ("Mask Layer", 17, 20)])
+        self.assertEqual(jobs[0].layers, ["key", "fill"])
+        self.assertEqual(jobs[0].output, "/review/sh010/Light_Layer.####.jpg")
+
+    def test_a_worker_command_renders_its_job_only(self):
+        job = contactsheetrender.RenderJob("Light Layer", ["key", "fill"], 9, 16, "/review/out.####.jpg")
+        command = contactsheetrender.get_worker_command(job, "sh010.nk", "Read1", "lightweight", "nuke")
+
+        self.assertEqual(command[:3], ["nuke", "-t", os.path.abspath(contactsheetrender.__file__)])
+        self.assertIn("--worker", command)
+        self.assertEqual(command[command.index("--frames") + 1], "9-16")
+        self.assertEqual(json.loads(command[command.index("--layers") + 1]), ["key", "fill"])
+        self.assertEqual(command[command.index("--section") + 1], "Light Layer")
+
+
+class WorkerPoolTest(unittest.TestCase):
+
+    def test_workers_limit_the_running_processes(self):
+        lock = threading.Lock()
+        running = [0]
+        peak = [0]
+        commands = [["nuke", "-t", "render.py", str(index)] for index in range(8)]
+        ran = []
+
+        def run(command):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+                ran.append(command)
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+            return Result(0)
+
+        failures = contactsheetrender.run_workers(commands, workers=3, run=run)
+        self.assertEqual(failures, [])
+        self.assertEqual(sorted(ran), sorted(commands))
+        self.assertLessEqual(peak[0], 3)
+        self.assertGreater(peak[0], 1)
+
+    def test_the_failed_commands_are_returned(self):
+        commands = [["nuke", "-t", "render.py", str(index)] for index in range(4)]
+
+        def run(command):
+            return Result(1 if command[3] in ("1", "3") else 0)
+
+        failures = contactsheetrender.run_workers(commands, workers=2, run=run)
+        self.assertEqual(failures, [(commands[1], 1), (commands[3], 1)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+#------------------------------------------------------------------------------#
+#-------------------------------------------------------------------- HEADER --#
+
+"""
+:synopsis:
+    Tests of the per node state of the contribution callbacks.
+"""
+
+#------------------------------------------------------------------------------#
+#------------------------------------------------------------------- IMPORTS --#
+
+import unittest
+
+import fakenuke
+
+nuke = fakenuke.install()
+
+import contribution
+
+#------------------------------------------------------------------------------#
+#----------------------------------------------------------------- FUNCTIONS --#
+
+class DestroyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.gui = nuke.GUI
+        self.execute_in_main_thread = nuke.executeInMainThread
+        nuke.GUI = True
+        nuke.executeInMainThread = lambda function, args=(): None
+
+    def tearDown(self):
+        nuke.GUI = self.gui
+        nuke.executeInMainThread = self.execute_in_main_thread
+        nuke.this_node = None
+        contribution._applied_indexes.clear()
+        contribution._pending_nodes.clear()
+
+    def test_deleting_a_node_forgets_its_state(self):
+        deleted = fakenuke.Node("contribution1", "contribution")
+        kept = fakenuke.Node("contribution2", "contribution")
+        for node in (deleted, kept):
+            contribution._applied_indexes[node.fullName()] = object()
+            contribution.schedule_input_update(node)
+
+        nuke.this_node = deleted
+        contribution.onDestroy()
+        self.assertEqual(list(contribution._applied_indexes), ["contribution2"])
+        self.assertEqual(list(contribution._pending_nodes), ["contribution2"])
+
+
+class FlushTest(unittest.TestCase):
+
+    def setUp(self):
+        self.gui = nuke.GUI
+        self.execute_in_main_thread = nuke.executeInMainThread
+        self.original_update_input = contribution.update_input
+        self.main_thread_calls = []
+        self.updated = []
+        nuke.GUI = True
+        nuke.executeInMainThread = lambda function, args=(): self.main_thread_calls.append(function)
+
+    def tearDown(self):
+        nuke.GUI = self.gui
+        nuke.executeInMainThread = self.execute_in_main_thread
+        contribution.update_input = self.original_update_input
+        contribution._pending_nodes.clear()
+        for node_name in ("contribution1", "contribution2", "contribution3"):
+            nuke.root_node.children.pop(node_name, None)
+
+    def update_input(self, node):
+        if node.name() == "contribution1":
+            raise KeyError("layer_layer_light_choice")
+        self.updated.append(node.name())
+
+    def test_a_failed_update_does_not_stop_the_later_ones(self):
+        contribution.update_input = self.update_input
+        nodes = [nuke.root_node.add(fakenuke.Node("contribution{}".format(i + 1), "contribution")) for i in range(3)]
+        contribution.schedule_input_update(nodes[0])
+        contribution.schedule_input_update(nodes[1])
+        self.main_thread_calls.pop()()
+        self.assertEqual(self.updated, ["contribution2"])
+        self.assertEqual(len(contribution._pending_nodes), 0)
+
+        contribution.schedule_input_update(nodes[2])
+        self.assertEqual(len(self.main_thread_calls), 1)
+        self.main_thread_calls.pop()()
+        self.assertEqual(self.updated, ["contribution2", "contribution3"])
+
+
+if __name__ == "__main__":
+    unittest.main()
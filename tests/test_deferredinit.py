@@ -0,0 +1,73 @@
+#------------------------------------------------------------------------------#
+#-------------------------------------------------------------------- HEADER --#
+
+"""
+:synopsis:
+    Tests of the deferred initialisation during a script load, in and out of the GUI.
+"""
+
+#------------------------------------------------------------------------------#
+#------------------------------------------------------------------- IMPORTS --#
+
+import unittest
+
+import fakenuke
+
+nuke = fakenuke.install()
+
+import deferredinit
+
+#------------------------------------------------------------------------------#
+#----------------------------------------------------------------- FUNCTIONS --#
+
+class DeferTest(unittest.TestCase):
+
+    def setUp(self):
+        self.main_thread_calls = []
+        self.initialized = []
+        self.gui = nuke.GUI
+        self.execute_in_main_thread = nuke.executeInMainThread
+        nuke.executeInMainThread = lambda function, args=(): self.main_thread_calls.append((function, args))
+
+    def tearDown(self):
+        nuke.GUI = self.gui
+        nuke.executeInMainThread = self.execute_in_main_thread
+        deferredinit._state["loading"] = False
+        deferredinit._deferred_nodes.clear()
+
+    def create_node(self, name):
+        node = fakenuke.Node(name, "gradeaov")
+        if not deferredinit.defer(node, self.initialized.append):
+            self.initialized.append(node)
+        return node
+
+    def test_the_gui_defers_until_the_first_use(self):
+        nuke.GUI = True
+        deferredinit.begin_script_load()
+        node = self.create_node("GradeAOV1")
+        self.assertEqual(self.initialized, [])
+
+        deferredinit.end_script_load()
+        self.assertEqual(deferredinit.deferred_count(), 1)
+        self.assertTrue(deferredinit.initialize(node))
+        self.assertEqual(self.initialized, [node])
+
+    def test_a_new_gui_script_ends_loading_from_the_event_loop(self):
+        nuke.GUI = True
+        deferredinit.begin_script_load()
+        for function, args in self.main_thread_calls:
+            function(*args)
+        node = self.create_node("GradeAOV1")
+        self.assertEqual(self.initialized, [node])
+
+    def test_a_root_without_script_load_in_terminal_mode_does_not_defer(self):
+        nuke.GUI = False
+        deferredinit.begin_script_load()
+        node = self.create_node("GradeAOV1")
+        self.assertFalse(deferredinit.is_loading())
+        self.assertEqual(self.initialized, [node])
+        self.assertEqual(deferredinit.deferred_count(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+#------------------------------------------------------------------------------#
+#-------------------------------------------------------------------- HEADER --#
+
+"""
+:synopsis:
+    Tests of the GradeAOV slot solo and mute, against the fake `nuke` module.
+"""
+
+#------------------------------------------------------------------------------#
+#------------------------------------------------------------------- IMPORTS --#
+
+import json
+import unittest
+
+import fakenuke
+
+nuke = fakenuke.install()
+
+import gradeaov
+
+#------------------------------------------------------------------------------#
+#----------------------------------------------------------------- FUNCTIONS --#
+
+def create_gradeaov(layer_names):
+    """Return a GradeAOV group whose slots of layer_names hold their merges."""
+    node = fakenuke.Node("GradeAOV1", autolabel="", layer_count=len(layer_names))
+    registry = {}
+    for layer_name in layer_names:
+        for kind in gradeaov.SLOT_KNOBS:
+            knob_name = "{}_{}".format(layer_name, kind)
+            node.addKnob(fakenuke.Knob(knob_name))
+        node["{}_mute".format(layer_name)].setLabel(gradeaov.MUTE_LABEL)
+        node["{}_solo".format(layer_name)].setLabel(gradeaov.SOLO_LABEL)
+        for role in gradeaov.SLOT_NODES:
+            node.add(fakenuke.Node("{}_{}".format(layer_name, role), "Merge2", disable=0))
+        registry[layer_name] = dict((role, "{}_{}".format(layer_name, role)) for role in gradeaov.SLOT_NODES)
+    node.addKnob(fakenuke.Knob(gradeaov.REGISTRY_KNOB, json.dumps(registry)))
+    return node
+
+
+class SoloTest(unittest.TestCase):
+
+    def setUp(self):
+        self.layers = ["layer_0", "layer_1", "layer_2"]
+        self.node = create_gradeaov(self.layers)
+        nuke.this_node = self.node
+
+    def disabled(self, layer_name):
+        return self.node.children["{}_out".format(layer_name)]["disable"].value()
+
+    def test_solo_leaves_only_its_merge_enabled(self):
+        gradeaov.set_solo(self.node, "layer_1")
+        self.assertEqual([self.disabled(layer) for layer in self.layers], [1, 0, 1])
+        self.assertEqual(self.node["layer_1_solo"].label(), gradeaov.SOLOED_LABEL)
+
+    def test_unsolo_restores_the_merges_and_keeps_muted_slots_muted(self):
+        gradeaov.mute_layer("layer_2")
+        gradeaov.set_solo(self.node, "layer_1")
+        gradeaov.set_solo(self.node, "layer_1")
+        self.assertEqual([self.disabled(layer) for layer in self.layers], [0, 0, 1])
+        self.assertEqual(self.node["layer_2_mute"].label(), gradeaov.MUTED_LABEL)
+        self.assertFalse(self.node["layer_2_link"].enabled)
+        self.assertNotIn(gradeaov.SOLO_PREVIOUS, self.node[gradeaov.REGISTRY_KNOB].value())
+
+    def test_removing_the_soloed_slot_restores_the_others(self):
+        gradeaov.set_solo(self.node, "layer_0")
+        gradeaov.remove_slots(self.node, ["layer_0"])
+        self.assertNotIn("layer_0_out", self.node.children)
+        self.assertEqual([self.disabled(layer) for layer in self.layers[1:]], [0, 0])
+
+
+class LegacySlotTest(unittest.TestCase):
+
+    def setUp(self):
+        # Slot knobs as the inline gizmo script of older versions made them
+        self.node = fakenuke.Node("GradeAOV1", tile_color=gradeaov.DEFAULT_COLOR, disable=False,
+                                  layer_0_link="RGBA_key", layer_0_remove="exec('remove_layer(\"layer_0\", layer_link_autolabel)')",
+                                  layer_0_mute="layer_link_autolabel = 'layer_0'\nexec('mute_layer(\"layer_0\")')",
+                                  layer_0_solo="exec('solo_layer(\"layer_0\")')")
+        self.node["layer_0_mute"].setLabel(gradeaov.MUTE_LABEL)
+        for role in gradeaov.SLOT_NODES:
+            self.node.add(fakenuke.Node("layer_0_{}".format(role), "Merge2", disable=0))
+        nuke.this_node = self.node
+
+    def test_legacy_buttons_call_the_module(self):
+        gradeaov.initialize_node(self.node)
+        for kind in gradeaov.SLOT_BUTTONS:
+            self.assertEqual(self.node["layer_0_{}".format(kind)].value(), gradeaov.SLOT_SCRIPT.format("layer_0", kind))
+
+        exec(self.node["layer_0_mute"].value(), {"nuke": nuke})
+        self.assertEqual(self.node.children["layer_0_out"]["disable"].value(), 1)
+        self.assertEqual(self.node["layer_0_mute"].label(), gradeaov.MUTED_LABEL)
+
+
+if __name__ == "__main__":
+    unittest.main()
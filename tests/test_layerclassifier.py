@@ -0,0 +1,115 @@
+#------------------------------------------------------------------------------#
+#-------------------------------------------------------------------- HEADER --#
+
+"""
+:synopsis:
+    Tests of the headless layer classification: section and exclusion precedence,
+    raw channel lists and the classification cache.
+"""
+
+#------------------------------------------------------------------------------#
+#------------------------------------------------------------------- IMPORTS --#
+
+import unittest
+
+import fakenuke
+
+fakenuke.install()
+
+import layerclassifier
+import layerindex
+
+# ---------------------------------------------------------------------------- #
+# ----------------------------------------------------------------- GLOBALS -- #
+
+PREFERENCES = {
+    "Exclusion Keywords": ["crypto", ""],
+    "Light Layer": ["RGBA_", "key"],
+    "Mask Layer": ["mask", "M"],
+    "Tech Layer": ["depth"],
+    "Utility Layer": ["P", "normal", "mask_util"],
+    "custom Layer": ["CONT_"],
+}
+
+#------------------------------------------------------------------------------#
+#----------------------------------------------------------------- FUNCTIONS --#
+
+class LayerClassifierTest(unittest.TestCase):
+
+    def setUp(self):
+        self.classifier = layerclassifier.LayerClassifier(PREFERENCES)
+
+    def test_exclusion_wins_over_every_section(self):
+        sections = self.classifier.classify(["crypto_RGBA_key", "CONT_crypto", "RGBA_key"])
+        self.assertEqual(sections["Light Layer"], ["RGBA_key"])
+        self.assertEqual(sections["custom Layer"], [])
+
+    def test_custom_keywords_take_priority(self):
+        sections = self.classifier.classify(["CONT_RGBA_key"])
+        self.assertEqual(sections["custom Layer"], ["CONT_RGBA_key"])
+        self.assertEqual(sections["Light Layer"], [])
+
+    def test_a_layer_can_belong_to_several_sections(self):
+        sections = self.classifier.classify(["mask_util"])
+        self.assertEqual(sections["Mask Layer"], ["mask_util"])
+        self.assertEqual(sections["Utility Layer"], ["mask_util"])
+
+    def test_single_characters_only_match_the_name_or_its_prefix(self):
+        sections = self.classifier.classify(["P", "P_world", "M-matte", "RGBA_Pool"])
+        self.assertEqual(sections["Utility Layer"], ["P", "P_world"])
+        self.assertEqual(sections["Mask Layer"], ["M-matte"])
+        self.assertEqual(sections["Light Layer"], ["RGBA_Pool"])
+
+    def test_unclassified_layers_fall_back_to_tech(self):
+        sections = self.classifier.classify(["rgba", "depth"])
+        self.assertEqual(sections["Tech Layer"], ["depth", "rgba"])
+
+    def test_sections_are_sorted_and_cover_every_key(self):
+        sections = self.classifier.classify(["RGBA_rim", "RGBA_fill", "RGBA_rim"])
+        self.assertEqual(list(sections), layerclassifier.SECTION_KEYS)
+        self.assertEqual(sections["Light Layer"], ["RGBA_fill", "RGBA_rim"])
+
+    def test_raw_channels_are_classified_per_layer(self):
+        channels = ["rgba.red", "rgba.green", "RGBA_key.red", "RGBA_key.green", "crypto00.red"]
+        sections = layerclassifier.classify_channels(channels, self.classifier)
+        self.assertEqual(sections["Light Layer"], ["RGBA_key"])
+        self.assertEqual(sections["Tech Layer"], ["rgba"])
+
+
+class LayerClassificationCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        layerindex.clear()
+        self.cache = layerclassifier.LayerClassificationCache(maxsize=2)
+        self.classifier = layerclassifier.LayerClassifier(PREFERENCES)
+        self.node = fakenuke.Node("Read1", "Read")
+        self.node.channel_list = ["rgba.red", "RGBA_key.red"]
+
+    def test_an_unchanged_node_is_a_hit(self):
+        sections = self.cache.get_sections(self.node, self.classifier)
+        self.assertIs(self.cache.get_sections(self.node, self.classifier), sections)
+
+    def test_changed_channels_are_classified_again(self):
+        self.cache.get_sections(self.node, self.classifier)
+        self.node.channel_list = ["rgba.red", "RGBA_key.red", "RGBA_fill.red"]
+        sections = self.cache.get_sections(self.node, self.classifier)
+        self.assertEqual(sections["Light Layer"], ["RGBA_fill", "RGBA_key"])
+
+    def test_invalidate_and_a_new_classifier_drop_the_entries(self):
+        sections = self.cache.get_sections(self.node, self.classifier)
+        self.cache.invalidate()
+        self.assertIsNot(self.cache.get_sections(self.node, self.classifier), sections)
+
+        classifier = layerclassifier.LayerClassifier(dict(PREFERENCES, **{"Exclusion Keywords": ["RGBA_"]}))
+        self.assertEqual(self.cache.get_sections(self.node, classifier)["Light Layer"], [])
+        self.assertEqual(len(self.cache.entries), 1)
+
+    def test_the_least_recently_used_node_is_dropped(self):
+        nodes = [fakenuke.Node("Read{}".format(i + 1), "Read") for i in range(3)]
+        for node in nodes:
+            self.cache.get_sections(node, self.classifier)
+        self.assertEqual([key[0] for key in self.cache.entries], ["Read2", "Read3"])
+
+
+if __name__ == "__main__":
+    unittest.main()
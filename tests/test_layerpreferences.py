@@ -0,0 +1,84 @@
+#------------------------------------------------------------------------------#
+#-------------------------------------------------------------------- HEADER --#
+
+"""
+:synopsis:
+    Tests of the layered preferences: keyword removals and snapshot writes.
+"""
+
+#------------------------------------------------------------------------------#
+#------------------------------------------------------------------- IMPORTS --#
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import fakenuke
+
+fakenuke.install()
+
+import layerpreferences
+
+#------------------------------------------------------------------------------#
+#----------------------------------------------------------------- FUNCTIONS --#
+
+class LayeredPreferencesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.studio_path = os.path.join(self.folder, "studio.json")
+        self.user_path = os.path.join(self.folder, "user.json")
+        self.snapshot_path = os.path.join(self.folder, "snapshot.json")
+        with open(self.studio_path, "w") as file:
+            json.dump({"Exclusion Keywords": ["crypto", "rgba_old"]}, file)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def create_preferences(self):
+        return layerpreferences.LayeredPreferences(
+            [self.studio_path, self.user_path], layerpreferences.DEFAULT_PREFERENCES,
+            layerpreferences.validate_layermanager_preferences, self.snapshot_path)
+
+    def test_the_user_level_removes_a_studio_keyword(self):
+        preferences = self.create_preferences()
+        data = preferences.load()
+        data["Exclusion Keywords"] = ["rgba_old", "rgba"]
+        saved = preferences.save(data)
+
+        self.assertEqual(saved["Exclusion Keywords"], ["rgba_old", "rgba"])
+        with open(self.user_path) as file:
+            self.assertEqual(json.load(file)["Exclusion Keywords"], ["rgba", "-crypto"])
+        self.assertEqual(self.create_preferences().load()["Exclusion Keywords"], ["rgba_old", "rgba"])
+
+    def test_the_snapshot_is_only_written_when_it_changed(self):
+        preferences = self.create_preferences()
+        preferences.load()
+        first_write = os.stat(self.snapshot_path).st_mtime_ns
+        os.utime(self.snapshot_path, ns=(first_write - 10 ** 9, first_write - 10 ** 9))
+
+        preferences.load()
+        self.assertEqual(os.stat(self.snapshot_path).st_mtime_ns, first_write - 10 ** 9)
+
+        with open(self.studio_path, "w") as file:
+            json.dump({"Exclusion Keywords": ["crypto", "deep"]}, file)
+        preferences.load()
+        self.assertNotEqual(os.stat(self.snapshot_path).st_mtime_ns, first_write - 10 ** 9)
+
+    def test_an_edited_source_is_read_on_the_next_load(self):
+        preferences = self.create_preferences()
+        preferences.load()
+        # Another session starts from the snapshot, then the studio file is edited
+        other_session = self.create_preferences()
+        self.assertEqual(other_session.load()["Exclusion Keywords"], ["crypto", "rgba_old"])
+
+        with open(self.studio_path, "w") as file:
+            json.dump({"Exclusion Keywords": ["crypto", "deep_legacy"]}, file)
+        self.assertEqual(preferences.load()["Exclusion Keywords"], ["crypto", "deep_legacy"])
+        self.assertEqual(other_session.load()["Exclusion Keywords"], ["crypto", "deep_legacy"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+#------------------------------------------------------------------------------#
+#-------------------------------------------------------------------- HEADER --#
+
+"""
+:synopsis:
+    Tests that the stubs of menu.py only import their plugin module on first call.
+"""
+
+#------------------------------------------------------------------------------#
+#------------------------------------------------------------------- IMPORTS --#
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import fakenuke
+
+nuke = fakenuke.install()
+
+import deferredinit
+import lazyplugins
+
+# ---------------------------------------------------------------------------- #
+# ----------------------------------------------------------------- GLOBALS -- #
+
+MODULE_NAME = "lazyplugins_test_plugin"
+
+PLUGIN_CODE = """
+calls = []
+
+def run(*args):
+    calls.append(args)
+    return "ran"
+
+def initialize_node(node):
+    calls.append(node)
+"""
+
+#------------------------------------------------------------------------------#
+#----------------------------------------------------------------- FUNCTIONS --#
+
+class LazyStubTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        with open(os.path.join(self.folder, MODULE_NAME + ".py"), "w") as file:
+            file.write(PLUGIN_CODE)
+        sys.path.insert(0, self.folder)
+        self.gui = nuke.GUI
+        self.execute_in_main_thread = nuke.executeInMainThread
+
+    def tearDown(self):
+        sys.path.remove(self.folder)
+        sys.modules.pop(MODULE_NAME, None)
+        shutil.rmtree(self.folder)
+        nuke.GUI = self.gui
+        nuke.executeInMainThread = self.execute_in_main_thread
+        nuke.this_node = None
+        deferredinit._state["loading"] = False
+        deferredinit._deferred_nodes.clear()
+
+    def test_the_module_is_imported_on_the_first_call(self):
+        stub = lazyplugins.lazy_function(MODULE_NAME, "run")
+        self.assertNotIn(MODULE_NAME, sys.modules)
+
+        self.assertEqual(stub(1, 2), "ran")
+        self.assertIn(MODULE_NAME, sys.modules)
+        self.assertEqual(sys.modules[MODULE_NAME].calls, [(1, 2)])
+
+    def test_a_node_created_by_a_script_load_does_not_import_the_module(self):
+        nuke.GUI = True
+        nuke.executeInMainThread = lambda function, args=(): None
+        on_create = lazyplugins.lazy_on_create(MODULE_NAME, "initialize_node")
+        node = fakenuke.Node("GradeAOV1", "gradeaov")
+        nuke.this_node = node
+
+        deferredinit.begin_script_load()
+        on_create()
+        deferredinit.end_script_load()
+        self.assertNotIn(MODULE_NAME, sys.modules)
+
+        deferredinit.initialize(node)
+        self.assertEqual(sys.modules[MODULE_NAME].calls, [node])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+#------------------------------------------------------------------------------#
+#-------------------------------------------------------------------- HEADER --#
+
+"""
+:synopsis:
+    Startup budget of menu.py against the fake `nuke` module.
+
+    menu.py runs in fresh interpreters, the plugin modules imported by the
+    other tests would hide the ones it imports.
+"""
+
+#------------------------------------------------------------------------------#
+#------------------------------------------------------------------- IMPORTS --#
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import unittest
+
+import fakenuke
+
+# ---------------------------------------------------------------------------- #
+# ----------------------------------------------------------------- GLOBALS -- #
+
+MENU_PATH = os.path.join(fakenuke.ROOT, "layermanager", "menu.py")
+BUDGET_MS = 10.0
+RUNS = 3
+
+# Modules only imported by the first command or callback
+LAZY_MODULES = ["layermanager", "shuffle", "gradeaov", "contribution", "contactsheet", "PySide2"]
+
+CHILD_CODE = """
+import json, sys, time
+sys.path.insert(0, {tests_path!r})
+import fakenuke
+nuke = fakenuke.install()
+with open({menu_path!r}) as menu_file:
+    code = compile(menu_file.read(), {menu_path!r}, "exec")
+start = time.perf_counter()
+exec(code, {{"__name__": "menu", "__file__": {menu_path!r}}})
+menu_ms = (time.perf_counter() - start) * 1000.0
+print(json.dumps({{
+    "menu_ms": menu_ms,
+    "modules": [name for name in {lazy_modules!r} if name in sys.modules],
+    "commands": sorted(nuke.main_menu.commands),
+}}))
+"""
+
+#------------------------------------------------------------------------------#
+#----------------------------------------------------------------- FUNCTIONS --#
+
+def run_menu():
+    """Run menu.py in a fresh interpreter and return its time, lazy modules imported and commands."""
+    code = CHILD_CODE.format(tests_path=os.path.dirname(os.path.abspath(__file__)),
+                             menu_path=MENU_PATH, lazy_modules=LAZY_MODULES)
+    output = subprocess.check_output([sys.executable, "-c", code])
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+class MenuStartupTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.results = [run_menu() for _ in range(RUNS)]
+
+    def test_menu_does_not_import_the_plugins(self):
+        self.assertEqual(self.results[0]["modules"], [])
+        self.assertEqual(self.results[0]["commands"], ["Layer Manager", "Shuffle Auto"])
+
+    def test_menu_is_under_the_budget(self):
+        menu_ms = statistics.median(result["menu_ms"] for result in self.results)
+        self.assertLess(menu_ms, BUDGET_MS)
+
+
+if __name__ == "__main__":
+    unittest.main()
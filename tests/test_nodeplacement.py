@@ -0,0 +1,61 @@
+#------------------------------------------------------------------------------#
+#-------------------------------------------------------------------- HEADER --#
+
+"""
+:synopsis:
+    Tests of the placement index reused between the node placements.
+"""
+
+#------------------------------------------------------------------------------#
+#------------------------------------------------------------------- IMPORTS --#
+
+import unittest
+
+import fakenuke
+
+nuke = fakenuke.install()
+
+import nodeplacement
+
+#------------------------------------------------------------------------------#
+#----------------------------------------------------------------- FUNCTIONS --#
+
+class PlacementIndexCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.group = fakenuke.Node("Group1")
+        self.source = self.group.add(fakenuke.Node("Read1", "Read"))
+
+    def tearDown(self):
+        nodeplacement._placement_indexes.clear()
+
+    def get_index(self):
+        return nodeplacement.get_placement_index(self.group)
+
+    def test_placements_reuse_the_index(self):
+        first_index = self.get_index()
+        positions = set()
+        for i in range(3):
+            index = self.get_index()
+            node = self.group.add(fakenuke.Node("Shuffle{}".format(i + 1), "Shuffle2"))
+            positions.add(nodeplacement.place_under(node, self.source, index))
+        self.assertEqual(len(positions), 3)
+        self.assertIs(self.get_index(), first_index)
+
+    def test_a_created_node_rebuilds_the_index(self):
+        index = self.get_index()
+        node = self.group.add(fakenuke.Node("Blur1", "Blur"))
+        node.setXYpos(*nodeplacement.get_position_under(self.source))
+        self.assertIsNot(self.get_index(), index)
+        self.assertFalse(self.get_index().is_free(node.xpos(), node.ypos(), 80, 18))
+
+    def test_a_moved_node_rebuilds_the_index(self):
+        index = self.get_index()
+        self.source.setXYpos(500, 500)
+        index = self.get_index()
+        self.assertFalse(index.is_free(500, 500, 80, 18))
+        self.assertTrue(index.is_free(0, 0, 80, 18))
+
+
+if __name__ == "__main__":
+    unittest.main()